@@ -700,8 +700,6 @@ async def create_ai_config(config: AIConfigCreate):
         # If this is the first config, make it active and reload AIConfig
         if manager.get_active_config_name() == config.name:
             AIConfig.reload()
-            from app.services.ai_service import reset_ai_service
-            reset_ai_service()
         
         return {"status": "success", "message": f"Config '{config.name}' created"}
     except ValueError as e:
@@ -764,8 +762,6 @@ async def update_ai_config_by_name(name: str, config: AIConfigUpdateRequest):
         # Reload AIConfig if this was the active config
         if manager.get_active_config_name() == new_name:
             AIConfig.reload()
-            from app.services.ai_service import reset_ai_service
-            reset_ai_service()
         
         return {"status": "success", "message": f"Config '{name}' updated"}
     except HTTPException:
@@ -827,8 +823,6 @@ async def activate_ai_config(name: str):
         
         # Reload AIConfig to use new active config
         AIConfig.reload()
-        from app.services.ai_service import reset_ai_service
-        reset_ai_service()
         
         return {"status": "success", "message": f"Config '{name}' activated"}
     except ValueError as e:
@@ -898,45 +892,25 @@ async def test_ai_connection_with_config(config: AIConfigUpdate):
         }
     
     try:
-        from app.services.ai_service import AIService, get_ai_service
-        from app.core.config import AIConfig
-        
-        # Temporarily update AIConfig for testing
-        old_base_url = AIConfig.BASE_URL
-        old_api_key = AIConfig.API_KEY
-        old_model = AIConfig.MODEL
-        old_max_tokens = AIConfig.MAX_TOKENS
-        old_temperature = AIConfig.TEMPERATURE
-        old_timeout = AIConfig.TIMEOUT
-        old_streaming_enabled = AIConfig.STREAMING_ENABLED
-        
-        try:
-            AIConfig.BASE_URL = config.base_url
-            AIConfig.API_KEY = config.api_key
-            AIConfig.MODEL = config.model or "gpt-4o-mini"
-            AIConfig.MAX_TOKENS = config.max_tokens or 2000
-            AIConfig.TEMPERATURE = config.temperature or 0.7
-            AIConfig.TIMEOUT = 60
+        from app.services.ai_service import AIService
+        from app.core.config import AIConfigSnapshot
+        
+        # Build a throwaway service for the provided config (the active AIConfig is left untouched)
+        test_service = AIService(AIConfigSnapshot(
+            base_url=config.base_url,
+            api_key=config.api_key,
+            model=(config.model or "").strip() or "gpt-4o-mini",
+            max_tokens=config.max_tokens or 2000,
+            temperature=config.temperature or 0.7,
+            timeout=60,
             # Use streaming_enabled from config if provided, otherwise default to True
-            AIConfig.STREAMING_ENABLED = config.streaming_enabled if config.streaming_enabled is not None else True
-            
-            # Reset service to pick up new config
-            from app.services.ai_service import reset_ai_service
-            reset_ai_service()
-            
-            test_service = get_ai_service()
-            logger.debug(f"AI Test API: Created test service with base_url={AIConfig.BASE_URL}, streaming_enabled={AIConfig.STREAMING_ENABLED}")
+            streaming_enabled=config.streaming_enabled if config.streaming_enabled is not None else True
+        ))
+        logger.debug(f"AI Test API: Created test service with base_url={test_service.base_url}, streaming_enabled={test_service.streaming_enabled}")
+        try:
             success, message = await test_service.test_connection()
         finally:
-            # Restore original config
-            AIConfig.BASE_URL = old_base_url
-            AIConfig.API_KEY = old_api_key
-            AIConfig.MODEL = old_model
-            AIConfig.MAX_TOKENS = old_max_tokens
-            AIConfig.TEMPERATURE = old_temperature
-            AIConfig.TIMEOUT = old_timeout
-            AIConfig.STREAMING_ENABLED = old_streaming_enabled
-            reset_ai_service()
+            await test_service.aclose()
         
         logger.info(f"AI Test API: Test {'successful' if success else 'failed'}: {message}")
         return {
@@ -969,39 +943,23 @@ async def get_available_models(config: AIConfigUpdate):
         return {"models": []}
     
     try:
-        from app.services.ai_service import get_ai_service, reset_ai_service
-        from app.core.config import AIConfig
-        
-        # Temporarily update AIConfig for testing
-        old_base_url = AIConfig.BASE_URL
-        old_api_key = AIConfig.API_KEY
-        old_model = AIConfig.MODEL
-        old_max_tokens = AIConfig.MAX_TOKENS
-        old_temperature = AIConfig.TEMPERATURE
-        old_timeout = AIConfig.TIMEOUT
-        
+        from app.services.ai_service import AIService
+        from app.core.config import AIConfigSnapshot
+        
+        # Build a throwaway service for the provided config (the active AIConfig is left untouched)
+        temp_service = AIService(AIConfigSnapshot(
+            base_url=config.base_url,
+            api_key=config.api_key or "dummy-key",  # Some servers don't require key for /models
+            model=(config.model or "").strip() or "gpt-4o-mini",
+            max_tokens=config.max_tokens or 2000,
+            temperature=config.temperature or 0.7,
+            timeout=10,
+            streaming_enabled=True
+        ))
         try:
-            AIConfig.BASE_URL = config.base_url
-            AIConfig.API_KEY = config.api_key or "dummy-key"  # Some servers don't require key for /models
-            AIConfig.MODEL = config.model or "gpt-4o-mini"
-            AIConfig.MAX_TOKENS = config.max_tokens or 2000
-            AIConfig.TEMPERATURE = config.temperature or 0.7
-            AIConfig.TIMEOUT = 10
-            
-            # Reset service to pick up new config
-            reset_ai_service()
-            
-            temp_service = get_ai_service()
             models = await temp_service.get_available_models()
         finally:
-            # Restore original config
-            AIConfig.BASE_URL = old_base_url
-            AIConfig.API_KEY = old_api_key
-            AIConfig.MODEL = old_model
-            AIConfig.MAX_TOKENS = old_max_tokens
-            AIConfig.TEMPERATURE = old_temperature
-            AIConfig.TIMEOUT = old_timeout
-            reset_ai_service()
+            await temp_service.aclose()
         
         logger.info(f"AI Models API: Found {len(models)} models")
         return {"models": models}
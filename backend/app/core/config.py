@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
 
 # Module-level AIConfigsManager instance (singleton pattern)
 _manager_instance = None
@@ -24,6 +25,32 @@ def _get_app_config_manager():
     return _app_config_manager_instance
 
 
+@dataclass(frozen=True, slots=True)
+class AIConfigSnapshot:
+    """Immutable, hashable copy of the AIConfig fields used to talk to the AI server."""
+    base_url: str
+    api_key: str
+    model: str
+    max_tokens: int
+    temperature: float
+    timeout: int
+    streaming_enabled: bool
+    # Fields that affect the HTTP connection (the rest only change request payloads); computed once
+    connection_key: Tuple[str, str, int] = field(init=False, repr=False, compare=False)
+    # Built-in hash of all fields, computed once so change checks can start with an int compare
+    content_hash: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "connection_key", (self.base_url, self.api_key, self.timeout))
+        object.__setattr__(self, "content_hash", hash((
+            self.base_url, self.api_key, self.model, self.max_tokens,
+            self.temperature, self.timeout, self.streaming_enabled
+        )))
+    
+    def __hash__(self) -> int:
+        return self.content_hash
+
+
 class AIConfig:
     """AI configuration that reads from AIConfigsManager."""
     
@@ -39,6 +66,17 @@ class AIConfig:
     DETAILED_LOGGING: bool = True  # Will be synced from AppConfig
     STREAMING_ENABLED: bool = True
     
+    # Bumped on every change so consumers (e.g. get_ai_service) can detect changes with one int compare.
+    # Code that assigns the fields above directly must call mark_changed() (or reset_ai_service()) afterwards.
+    _version: int = 0
+    _snapshot: Optional[AIConfigSnapshot] = None
+    _snapshot_version: int = -1
+    
+    @classmethod
+    def mark_changed(cls) -> None:
+        """Signal that AI settings may have changed (invalidates the cached snapshot)."""
+        cls._version += 1
+    
     @classmethod
     def _update_from_manager(cls) -> None:
         """Update class variables from manager."""
@@ -71,6 +109,10 @@ class AIConfig:
         
         # Always sync DETAILED_LOGGING from AppConfig (regardless of active config)
         cls.DETAILED_LOGGING = AppConfig.get_detailed_logging()
+        
+        # Bump only after every field is written, so a concurrent snapshot() can't
+        # intern the old values under the new version
+        cls.mark_changed()
     
     
     # Predefined system prompts
@@ -103,6 +145,34 @@ Be thorough but concise. Use technical terminology when appropriate.""",
 Be specific and practical. Prioritize recommendations by severity."""
     }
     
+    @classmethod
+    def snapshot(cls) -> AIConfigSnapshot:
+        """
+        Get the current AI settings as an immutable snapshot.
+        
+        The same object is returned until the settings actually change, so callers
+        can detect changes with an identity check.
+        """
+        version = cls._version
+        if cls._snapshot_version != version:
+            # Stamp the version read before the fields, so a change made while
+            # building leaves the snapshot out of date rather than marked current
+            model = cls.MODEL.strip() if cls.MODEL else ""
+            snapshot = AIConfigSnapshot(
+                base_url=cls.BASE_URL,
+                api_key=cls.API_KEY or "",
+                model=model or "gpt-4o-mini",
+                max_tokens=cls.MAX_TOKENS,
+                temperature=cls.TEMPERATURE,
+                timeout=cls.TIMEOUT,
+                streaming_enabled=cls.STREAMING_ENABLED
+            )
+            previous = cls._snapshot
+            if previous is None or previous.content_hash != snapshot.content_hash or previous != snapshot:
+                cls._snapshot = snapshot
+            cls._snapshot_version = version
+        return cls._snapshot
+    
     @classmethod
     def is_configured(cls) -> bool:
         """Check if AI is configured (has API key and AI processing is globally enabled)."""
@@ -452,5 +522,5 @@ class SafeModeConfig:
 AIConfig._update_from_manager()
 
 # Export config classes
-__all__ = ["AIConfig", "AppConfig", "ZipSecurityConfig", "SafeModeConfig"]
+__all__ = ["AIConfig", "AIConfigSnapshot", "AppConfig", "ZipSecurityConfig", "SafeModeConfig"]
 
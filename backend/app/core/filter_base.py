@@ -8,7 +8,7 @@ import os
 from pathlib import Path
 from app.core.insight_base import Insight
 from app.core.models import InsightResult, ProgressEvent
-from app.services.file_handler import read_file_lines, read_file_chunks, CancelledError, parse_zip_path, extract_file_from_zip, ZIP_VIRTUAL_PATH_SEPARATOR, is_zip_file, list_zip_contents
+from app.services.file_handler import read_file_lines, aread_file_text_chunks, CancelledError, parse_zip_path, extract_file_from_zip, ZIP_VIRTUAL_PATH_SEPARATOR, is_zip_file, list_zip_contents, list_folder_files
 from app.utils.ripgrep import is_ripgrep_available, ripgrep_search, build_ripgrep_command
 
 logger = logging.getLogger(__name__)
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 class ReadingMode(Enum):
     """File reading mode for line filtering."""
     LINES = "lines"  # Line-by-line reading using read_file_lines()
-    CHUNKS = "chunks"  # Chunk-based reading using read_file_chunks()
+    CHUNKS = "chunks"  # Chunk-based reading using aread_file_text_chunks()
     RIPGREP = "ripgrep"  # Use ripgrep for ultra-fast pattern matching (10-100x faster)
 
 
@@ -103,11 +103,9 @@ class FileFilter:
         self._file_patterns: List[str] = []
     
     def _list_files_sync(self, folder_path: str) -> List[str]:
-        folder = Path(folder_path)
-        if not folder.is_dir():
+        if not os.path.isdir(folder_path):
             return []
-        files = [str(p.resolve()) for p in folder.rglob("*") if p.is_file()]
-        return sorted(files)
+        return list_folder_files(folder_path)
     
     def filter_files(self, *patterns: str) -> 'FileFilter':
         """
@@ -463,7 +461,7 @@ class LineFilter:
         total_lines_checked = 0
         
         logger.debug(f"LineFilter: Starting chunk-based filtering for {file_path} (chunk_size: {self.chunk_size:,} bytes)")
-        for chunk in read_file_chunks(file_path, chunk_size=self.chunk_size, cancellation_event=cancellation_event):
+        async for chunk in aread_file_text_chunks(file_path, chunk_size=self.chunk_size, cancellation_event=cancellation_event):
             chunk_count += 1
             # Combine chunk with buffer (handles lines split across chunks)
             text_to_process = chunk_buffer + chunk
@@ -579,13 +577,14 @@ class LineFilter:
             
             def run_ripgrep():
                 results = []
+                is_cancelled = cancellation_event.is_set if cancellation_event else None
                 try:
                     for line in ripgrep_search(
                         actual_file_path,
                         self.pattern  # pattern field now contains ripgrep_command
                     ):
-                        # Check for cancellation periodically
-                        if cancellation_event and cancellation_event.is_set():
+                        # Check for cancellation every 1024 matches
+                        if is_cancelled is not None and (len(results) & 1023) == 0 and is_cancelled():
                             raise CancelledError("Analysis cancelled")
                         results.append(line)
                 except Exception as e:
@@ -699,8 +698,7 @@ class FilterBasedInsight(Insight):
             else:
                 return [resolved_path]
         elif path_obj.is_dir():
-            files = [str(p.resolve()) for p in path_obj.rglob("*") if p.is_file()]
-            return sorted(files)
+            return list_folder_files(user_path)
         else:
             return []
     
@@ -93,7 +93,7 @@ class Insight(ABC):
         Returns:
             List of file paths (or virtual zip paths for files inside zip archives)
         """
-        from app.services.file_handler import is_zip_file, list_zip_contents
+        from app.services.file_handler import is_zip_file, list_zip_contents, list_folder_files
         
         path_obj = Path(user_path)
         if not path_obj.exists():
@@ -117,8 +117,7 @@ class Insight(ABC):
             else:
                 return [resolved_path]
         elif path_obj.is_dir():
-            files = [str(p.resolve()) for p in path_obj.rglob("*") if p.is_file()]
-            return sorted(files)
+            return list_folder_files(user_path)
         else:
             return []
     
@@ -195,11 +195,19 @@ async def startup_event():
     
     # Extract sample files if needed
     extract_sample_files()
+    
+    # Warm up the AI connection in the background (doesn't delay startup)
+    from app.services.ai_service import start_ai_warmup
+    start_ai_warmup()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down...")
+    from app.services.ai_service import close_ai_services
+    await close_ai_services()
+    from app.services.file_handler import close_open_zips
+    close_open_zips()
     logger.info("Shutdown complete")
 
 
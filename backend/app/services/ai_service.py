@@ -1,141 +1,312 @@
 import os
-import json
 import logging
 import asyncio
-from typing import Optional, Dict, Any, AsyncIterator
+import re
+import threading
+import functools
+import time
+from collections import ChainMap, OrderedDict
+from typing import Optional, Dict, Any, AsyncIterator, Mapping, Tuple
 import httpx
+import orjson
+
+from app.core.config import AIConfig, AIConfigSnapshot, AppConfig
 
 logger = logging.getLogger(__name__)
 
+# Fast path for the common SSE frame shape: {"choices":[{"delta":{"content":"..."}}]}
+# Frames that may carry errors fall back to a full orjson.loads.
+_DELTA_CONTENT_RE = re.compile(rb'"delta":\s*\{[^}]*?"content":\s*"((?:[^"\\]|\\.)*)"')
+
+# Cap on in-flight chat completion requests per service, so concurrent
+# insight auto-analyses don't flood the AI provider
+AI_MAX_CONCURRENT_REQUESTS = 4
+
+# SSE field prefix for data lines, and the OpenAI end-of-stream sentinel payload
+_SSE_DATA_PREFIX = b"data: "
+_SSE_DONE = b"[DONE]"
+# SSE lines end in CRLF, LF or a lone CR
+_SSE_EOL_RE = re.compile(rb"\r\n|\r|\n")
+
+# Keywords that mark a plain-text (non-SSE / non-JSON) line as an error message
+_ERROR_KEYWORDS_RE = re.compile(rb"error|unexpected|not found|invalid|failed", re.IGNORECASE)
+# Keywords that mark a JSON "message" field as an error
+_ERROR_MESSAGE_RE = re.compile(r"error|unexpected|not found|invalid", re.IGNORECASE)
+# Error texts that suggest a wrong endpoint (base URL missing /v1)
+_ENDPOINT_ERROR_RE = re.compile(r"endpoint|unexpected", re.IGNORECASE)
+_MISSING_ENDPOINT_RE = re.compile(r"not found|endpoint", re.IGNORECASE)
+_ENDPOINT_RE = re.compile(r"endpoint", re.IGNORECASE)
+
+# {name} placeholders in custom prompt templates
+_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+
+# Model lists change rarely; cache them per (base_url, api_key) for a few minutes
+MODELS_CACHE_TTL_SECONDS = 300
+_models_cache: Dict[Tuple[str, str], Tuple[float, list[str]]] = {}
+
+# Short probes (test connection, list models) fail fast on dead hosts
+_PROBE_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=3.0)
+
+# Detailed request logs show at most this many characters of each message
+LOG_MESSAGE_MAX_CHARS = 500
+
+# Keep idle connections around between analyses (httpx default expiry is 5s)
+_CLIENT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+
+
+# System prompts per prompt_type (unknown types fall back to "explain")
+_SYSTEM_PROMPTS: Dict[str, str] = {
+    "summarize": """You are a log analysis assistant. Summarize the following log analysis results concisely.
+Focus on:
+- Key findings
+- Important patterns
+- Critical issues
+
+Be brief and actionable.""",
+    
+    "explain": """You are a log analysis expert. Analyze the following log data and explain:
+- What patterns you observe
+- What these patterns indicate
+- Potential root causes
+- System behavior insights
+
+Be thorough but concise.""",
+    
+    "recommend": """You are a system reliability expert. Based on the following log analysis, provide:
+- Actionable recommendations
+- Priority of actions
+- Potential risks to address
+- Best practices to follow
+
+Be specific and practical."""
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _api_url(base_url: str, endpoint: str) -> str:
+    """
+    Build an OpenAI-compatible endpoint URL, ensuring the base URL ends with /v1.
+    
+    Cached: the base URL only changes with the config, so this runs once per (base_url, endpoint).
+    
+    Args:
+        base_url: Configured base URL
+        endpoint: Endpoint path relative to /v1 (e.g. "chat/completions")
+        
+    Returns:
+        Full endpoint URL
+    """
+    base_url_clean = base_url.rstrip('/')
+    if not base_url_clean.endswith('/v1'):
+        base_url_clean = f"{base_url_clean}/v1"
+        logger.debug("AI Service: Added /v1 prefix to base URL: %s -> %s", base_url, base_url_clean)
+    return f"{base_url_clean}/{endpoint}"
+
+
+def _truncate_message_for_log(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Return msg with its content cut to LOG_MESSAGE_MAX_CHARS (msg itself if already short)."""
+    content = msg.get("content")
+    if not isinstance(content, str) or len(content) <= LOG_MESSAGE_MAX_CHARS:
+        return msg
+    return {**msg, "content": f"{content[:LOG_MESSAGE_MAX_CHARS]}... [truncated, total length: {len(content)} chars]"}
+
+
+async def _iter_sse_lines(response) -> AsyncIterator[bytes]:
+    """
+    Split a streamed response body into raw lines without decoding it to str.
+    
+    Lines end at CRLF, LF or a lone CR, as in the SSE spec. Each chunk is appended
+    to one buffer and only the new bytes are scanned, so a frame spread over many
+    chunks is not re-copied per chunk.
+    """
+    buf = bytearray()
+    skip_lf = False
+    async for chunk in response.aiter_bytes():
+        if not chunk:
+            continue
+        # A CR ending the previous chunk may be the first half of a CRLF
+        if skip_lf and chunk[:1] == b"\n":
+            chunk = chunk[1:]
+        skip_lf = False
+        # The buffer holds no line breaks before this point
+        scan_from = len(buf)
+        buf += chunk
+        start = 0
+        for match in _SSE_EOL_RE.finditer(buf, scan_from):
+            yield bytes(buf[start:match.start()])
+            start = match.end()
+        if start:
+            skip_lf = start == len(buf) and buf[-1] == 0x0D
+            del buf[:start]
+    if buf:
+        yield bytes(buf)
+
 
 class AIService:
     """
-    Stateless AI service that reads configuration directly from AIConfig.
-    No instance variables - all config values are read from AIConfig on each use.
+    AI service bound to the connection settings of an AIConfigSnapshot.
+    
+    get_ai_service() hands out the instance matching the current AIConfig
+    snapshot: per-request settings are updated in place, and a fresh instance
+    is built only when the connection settings change.
     """
     
-    def __init__(self):
-        # Empty - AIService is stateless and reads directly from AIConfig
-        pass
+    __slots__ = (
+        "config", "base_url", "api_key", "model", "max_tokens", "temperature",
+        "timeout", "streaming_enabled", "_cfg_version", "_client", "_semaphore",
+        "_active", "_retired", "_lock"
+    )
     
-    def _get_base_url(self) -> str:
-        """Get base URL from AIConfig."""
-        from app.core.config import AIConfig
-        return AIConfig.BASE_URL
+    def __init__(self, config: Optional[AIConfigSnapshot] = None):
+        """
+        Args:
+            config: Config snapshot to bind to (defaults to the current AIConfig)
+        """
+        if config is None:
+            config = AIConfig.snapshot()
+        self.base_url: str = config.base_url
+        self.api_key: str = config.api_key
+        self.timeout: int = config.timeout
+        self.apply_call_settings(config)
+        self._cfg_version: int = AIConfig._version
+        # Created on first request and reused so TCP/TLS connections stay warm
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Requests currently using the client; a retired service's client is closed once this
+        # drops to 0. Both fields are only read and written under _lock.
+        self._active: int = 0
+        self._retired: bool = False
+        self._lock = threading.Lock()
     
-    def _normalize_base_url(self, base_url: str) -> str:
+    def apply_call_settings(self, config: AIConfigSnapshot) -> None:
         """
-        Normalize base URL to ensure it ends with /v1 for OpenAI-compatible endpoints.
+        Adopt the per-request settings (model, max_tokens, temperature, streaming) of a snapshot.
         
-        Args:
-            base_url: The base URL to normalize
-            
-        Returns:
-            Base URL with /v1 suffix if not already present
+        The snapshot must share this service's connection settings (base_url, api_key, timeout).
+        """
+        self.config: AIConfigSnapshot = config
+        self.model: str = config.model
+        self.max_tokens: int = config.max_tokens
+        self.temperature: float = config.temperature
+        self.streaming_enabled: bool = config.streaming_enabled
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client for this service, created lazily on first use."""
+        if self._client is None:
+            # Headers only depend on connection settings, which are fixed per service
+            self._client = httpx.AsyncClient(headers=self._build_headers(), timeout=self._get_timeout(), limits=_CLIENT_LIMITS)
+        return self._client
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent requests, created lazily inside the event loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(AI_MAX_CONCURRENT_REQUESTS)
+        return self._semaphore
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client (if one was created) and its pooled connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+    
+    def _acquire(self) -> httpx.AsyncClient:
+        """
+        Mark a request as in flight and return the client it must use until _release().
+        
+        A retired service's client is detached before it is closed, so a request that
+        starts after retirement gets a fresh client rather than one being closed.
+        """
+        with self._lock:
+            self._active += 1
+            return self.client
+    
+    def _release(self) -> None:
+        """End an in-flight request; closes the client if the service is retired and now idle."""
+        with self._lock:
+            self._active -= 1
+            client = self._detach_client() if self._retired and not self._active else None
+        if client is not None:
+            _close_client(client)
+    
+    def _retire(self) -> None:
+        """Mark the service as dropped from the pool; its client is closed once idle."""
+        with self._lock:
+            self._retired = True
+            client = self._detach_client() if not self._active else None
+        if client is not None:
+            _close_client(client)
+    
+    def _detach_client(self) -> Optional[httpx.AsyncClient]:
+        """Take the client off the service (call with _lock held)."""
+        client, self._client = self._client, None
+        return client
+    
+    def _get_timeout(self) -> httpx.Timeout:
         """
-        base_url_clean = base_url.rstrip('/')
-        if not base_url_clean.endswith('/v1'):
-            base_url_clean = f"{base_url_clean}/v1"
-            logger.debug(f"AI Service: Added /v1 prefix to base URL: {base_url.rstrip('/')} -> {base_url_clean}")
-        return base_url_clean
-    
-    def _get_api_key(self) -> str:
-        """Get API key from AIConfig."""
-        from app.core.config import AIConfig
-        return AIConfig.API_KEY or ""
-    
-    def _get_model(self) -> str:
-        """Get model from AIConfig, with default fallback."""
-        from app.core.config import AIConfig
-        model = AIConfig.MODEL.strip() if AIConfig.MODEL else "gpt-4o-mini"
-        return model if model else "gpt-4o-mini"
-    
-    def _get_max_tokens(self) -> int:
-        """Get max_tokens from AIConfig."""
-        from app.core.config import AIConfig
-        return AIConfig.MAX_TOKENS
-    
-    def _get_temperature(self) -> float:
-        """Get temperature from AIConfig."""
-        from app.core.config import AIConfig
-        return AIConfig.TEMPERATURE
-    
-    def _get_timeout(self) -> int:
-        """Get timeout from AIConfig."""
-        from app.core.config import AIConfig
-        return AIConfig.TIMEOUT
+        Get request timeout from the config snapshot.
+        
+        AIConfig.TIMEOUT bounds the read phase (long generations), while connect/pool
+        stay short so an unreachable host fails fast instead of waiting the full timeout.
+        """
+        return httpx.Timeout(connect=5.0, read=self.timeout, write=10.0, pool=5.0)
+    
+    def _is_configured(self) -> bool:
+        """Check if this service has an API key and AI processing is globally enabled."""
+        return bool(self.api_key) and AppConfig.get_ai_processing_enabled()
     
     def _is_detailed_logging_enabled(self) -> bool:
         """Check if detailed logging is enabled via config."""
-        try:
-            from app.core.config import AIConfig
-            return AIConfig.DETAILED_LOGGING
-        except Exception:
-            return False
+        return AIConfig.DETAILED_LOGGING
     
-    def _is_streaming_enabled(self) -> bool:
-        """Check if streaming is enabled via config."""
-        try:
-            from app.core.config import AIConfig
-            return AIConfig.STREAMING_ENABLED
-        except Exception:
-            return True  # Default to streaming for backward compatibility
-    
-    def _mask_sensitive_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
-        """Mask sensitive data in headers for logging."""
-        masked = headers.copy()
-        if "Authorization" in masked:
-            # Mask API key but keep Bearer prefix visible
-            auth = masked["Authorization"]
-            if auth.startswith("Bearer "):
-                key = auth[7:]
-                if len(key) > 8:
-                    masked["Authorization"] = f"Bearer {key[:8]}...{key[-4:]}"
-                else:
-                    masked["Authorization"] = "Bearer ***"
-        return masked
+    def _mask_sensitive_headers(self, headers: Dict[str, str]) -> Mapping[str, str]:
+        """Mask sensitive data in headers for logging (overlays the masked key instead of copying)."""
+        auth = headers.get("Authorization")
+        if not auth or not auth.startswith("Bearer "):
+            return headers
+        # Mask API key but keep Bearer prefix visible
+        key = auth[7:]
+        masked_auth = f"Bearer {key[:8]}...{key[-4:]}" if len(key) > 8 else "Bearer ***"
+        return ChainMap({"Authorization": masked_auth}, headers)
     
-    def _log_detailed_request(self, method: str, url: str, headers: Dict[str, str], payload: Optional[Dict[str, Any]] = None) -> None:
-        """Log detailed HTTP request information."""
-        if not self._is_detailed_logging_enabled():
+    def _log_detailed_request(self, method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Log detailed HTTP request information (headers are the client's default headers)."""
+        if not self._is_detailed_logging_enabled() or not logger.isEnabledFor(logging.INFO):
             return
         
-        masked_headers = self._mask_sensitive_headers(headers)
+        masked_headers = self._mask_sensitive_headers(self._build_headers())
         
         logger.info("=" * 80)
         logger.info("AI Service: Detailed Request Log")
         logger.info("=" * 80)
         logger.info(f"Method: {method}")
         logger.info(f"URL: {url}")
-        logger.info(f"Headers: {json.dumps(masked_headers, indent=2)}")
+        logger.info("Headers: %s", orjson.dumps(dict(masked_headers), option=orjson.OPT_INDENT_2).decode())
         
         if payload:
-            # Create a copy for logging to avoid modifying original
-            log_payload = payload.copy()
-            
-            # Truncate very long content in messages for readability
-            if "messages" in log_payload:
-                truncated_messages = []
-                for msg in log_payload["messages"]:
-                    msg_copy = msg.copy()
-                    if "content" in msg_copy and len(msg_copy["content"]) > 500:
-                        msg_copy["content"] = msg_copy["content"][:500] + f"... [truncated, total length: {len(msg['content'])} chars]"
-                    truncated_messages.append(msg_copy)
-                log_payload["messages"] = truncated_messages
-            
-            logger.info(f"Payload: {json.dumps(log_payload, indent=2, ensure_ascii=False)}")
+            # Truncate message content before serializing, so only the logged prefix is dumped
+            # (the original payload is left untouched)
+            log_payload = payload
+            if "messages" in payload:
+                log_payload = {**payload, "messages": [_truncate_message_for_log(msg) for msg in payload["messages"]]}
+            
+            logger.info("Payload: %s", orjson.dumps(log_payload, option=orjson.OPT_INDENT_2).decode())
         logger.info("=" * 80)
     
-    def _log_detailed_response(self, status_code: int, headers: Dict[str, str], body: Optional[str] = None, is_stream: bool = False) -> None:
-        """Log detailed HTTP response information."""
-        if not self._is_detailed_logging_enabled():
+    def _log_detailed_response(self, status_code: int, headers: Mapping[str, str], body: Optional[bytes] = None, is_stream: bool = False) -> None:
+        """Log detailed HTTP response information (the raw body is only decoded here, when logged)."""
+        if not self._is_detailed_logging_enabled() or not logger.isEnabledFor(logging.INFO):
             return
         
+        if body:
+            body = body.decode('utf-8', errors='ignore')
+        
         logger.info("=" * 80)
         logger.info("AI Service: Detailed Response Log")
         logger.info("=" * 80)
         logger.info(f"Status Code: {status_code}")
-        logger.info(f"Headers: {json.dumps(dict(headers), indent=2)}")
+        logger.info("Headers: %s", orjson.dumps(dict(headers), option=orjson.OPT_INDENT_2).decode())
         
         if body:
             # Truncate very long response bodies
@@ -149,32 +320,7 @@ class AIService:
         logger.info("=" * 80)
     
     def get_system_prompt(self, prompt_type: str) -> str:
-        prompts = {
-            "summarize": """You are a log analysis assistant. Summarize the following log analysis results concisely.
-Focus on:
-- Key findings
-- Important patterns
-- Critical issues
-
-Be brief and actionable.""",
-            
-            "explain": """You are a log analysis expert. Analyze the following log data and explain:
-- What patterns you observe
-- What these patterns indicate
-- Potential root causes
-- System behavior insights
-
-Be thorough but concise.""",
-            
-            "recommend": """You are a system reliability expert. Based on the following log analysis, provide:
-- Actionable recommendations
-- Priority of actions
-- Potential risks to address
-- Best practices to follow
-
-Be specific and practical."""
-        }
-        return prompts.get(prompt_type, prompts["explain"])
+        return _SYSTEM_PROMPTS.get(prompt_type, _SYSTEM_PROMPTS["explain"])
     
     def build_prompt(
         self,
@@ -196,28 +342,27 @@ Be specific and practical."""
             Complete prompt string
         """
         if prompt_type == "custom" and custom_prompt:
-            prompt = custom_prompt
+            replacements = {key: str(value) for key, value in variables.items()} if variables else {}
+            has_content_placeholder = "{result_content}" in custom_prompt
+            if has_content_placeholder:
+                replacements.setdefault("result_content", content)
             
-            if variables:
-                for key, value in variables.items():
-                    placeholder = "{" + key + "}"
-                    if placeholder in prompt:
-                        prompt = prompt.replace(placeholder, str(value))
+            prompt = custom_prompt
+            if replacements:
+                # Substitute every {placeholder} in one pass; unknown placeholders are left as-is
+                prompt = _PLACEHOLDER_RE.sub(lambda m: replacements.get(m.group(1), m.group(0)), prompt)
             
-            if "{result_content}" not in custom_prompt:
+            if not has_content_placeholder:
                 prompt += f"\n\n{content}"
-            else:
-                prompt = prompt.replace("{result_content}", content)
         else:
             prompt = content
         
         return prompt
     
     def _build_headers(self) -> Dict[str, str]:
-        """Build HTTP headers for AI API requests."""
-        api_key = self._get_api_key()
+        """Build the default HTTP headers for AI API requests (set once on the service's client)."""
         headers = {
-            "Authorization": f"Bearer {api_key}",
+            "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "X-Internal-Request": "true"  # Dummy header - customize as needed
         }
@@ -254,30 +399,22 @@ Be specific and practical."""
         Raises:
             Exception: If AI service is not configured or request fails
         """
-        from app.core.config import AIConfig
-        if not AIConfig.is_configured():
+        if not self._is_configured():
             raise ValueError("AI service is not configured. Please set OPENAI_API_KEY and enable AI_ENABLED.")
         
         system_prompt = self.get_system_prompt(prompt_type)
         user_prompt = self.build_prompt(content, prompt_type, custom_prompt, variables)
         
-        # Get config values from AIConfig
-        base_url = self._get_base_url()
-        model = self._get_model()
-        max_tokens = self._get_max_tokens()
-        temperature = self._get_temperature()
-        timeout = self._get_timeout()
-        streaming_enabled = self._is_streaming_enabled()
-        
-        if streaming_enabled:
-            logger.info(f"AI Service: Starting streaming analysis (model: {model}, prompt_type: {prompt_type})")
-        else:
-            logger.info(f"AI Service: Starting non-streaming analysis (model: {model}, prompt_type: {prompt_type})")
+        # Bind one config snapshot for the whole request, so an in-place settings
+        # update (apply_call_settings) can't mix values from two configs
+        config = self.config
+        base_url = config.base_url
+        model = config.model
+        max_tokens = config.max_tokens
+        temperature = config.temperature
+        streaming_enabled = config.streaming_enabled
         
-        # Normalize base URL to ensure /v1 suffix
-        base_url_clean = self._normalize_base_url(base_url)
-        url = f"{base_url_clean}/chat/completions"
-        headers = self._build_headers()
+        url = _api_url(base_url, "chat/completions")
         
         payload = {
             "model": model,
@@ -289,73 +426,78 @@ Be specific and practical."""
             "temperature": temperature,
             "stream": streaming_enabled
         }
+        # Serialize once, up front; httpx sends the bytes as-is
+        body = orjson.dumps(payload)
         
         # Log detailed request if enabled
-        self._log_detailed_request("POST", url, headers, payload)
+        self._log_detailed_request("POST", url, payload)
         
-        # Log request details (truncate content for readability)
-        logger.info(f"AI Service: Sending request to {url}")
-        logger.debug(f"AI Service: Model={model}, max_tokens={max_tokens}, temperature={temperature}, streaming={streaming_enabled}")
-        logger.debug(f"AI Service: System prompt length: {len(system_prompt)} chars")
-        logger.debug(f"AI Service: User prompt length: {len(user_prompt)} chars")
+        # Log request details as a single line
+        logger.info(
+            "AI Service: Sending %s request to %s "
+            "(model=%s, prompt_type=%s, max_tokens=%s, temperature=%s, "
+            "system_prompt=%d chars, user_prompt=%d chars, body=%d bytes)",
+            "streaming" if streaming_enabled else "non-streaming", url,
+            model, prompt_type, max_tokens, temperature,
+            len(system_prompt), len(user_prompt), len(body)
+        )
         
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
+        # Throttle concurrent requests to the provider (held for the whole stream)
+        async with self.semaphore:
+            client = self._acquire()
+            try:
                 if streaming_enabled:
                     # Streaming mode: use stream() method
-                    async with client.stream("POST", url, headers=headers, json=payload) as response:
+                    async with client.stream("POST", url, content=body) as response:
                         async for chunk in self._handle_streaming_response(response, base_url, url):
                             yield chunk
                 else:
                     # Non-streaming mode: use regular POST request
-                    response = await client.post(url, headers=headers, json=payload)
+                    response = await client.post(url, content=body)
                     async for chunk in self._handle_non_streaming_response(response, base_url, url):
                         yield chunk
         
-        except httpx.HTTPStatusError as e:
-            # This shouldn't happen now since we check status before raise_for_status
-            # But keep it as a fallback
-            error_message = f"HTTP {e.response.status_code}"
-            try:
-                # Try to get error details if available
-                if hasattr(e.response, 'text') and not hasattr(e.response, 'aread'):
-                    error_message += f": {e.response.text}"
-            except Exception:
-                pass
+            except httpx.HTTPStatusError as e:
+                # This shouldn't happen now since we check status before raise_for_status
+                # But keep it as a fallback
+                error_message = f"HTTP {e.response.status_code}"
+                try:
+                    # Try to get error details if available
+                    if hasattr(e.response, 'text') and not hasattr(e.response, 'aread'):
+                        error_message += f": {e.response.text}"
+                except Exception:
+                    pass
+                
+                # Add helpful hint for common 404 errors
+                if e.response.status_code == 404 and "/v1" not in base_url:
+                    error_message += f". Hint: Try adding '/v1' to your base URL: {base_url}/v1"
+                
+                logger.error(f"AI Service: HTTP error from {base_url} - {error_message}")
+                logger.error(f"AI Service: Request URL was: {url}")
+                raise Exception(f"AI API error ({base_url}): {error_message}")
             
-            # Add helpful hint for common 404 errors
-            base_url = self._get_base_url()
-            if e.response.status_code == 404 and "/v1" not in base_url:
-                error_message += f". Hint: Try adding '/v1' to your base URL: {base_url}/v1"
+            except httpx.RequestError as e:
+                logger.error(f"AI Service: Request error from {base_url} - {type(e).__name__}: {e}")
+                logger.error(f"AI Service: Request URL was: {url}")
+                raise Exception(f"AI API connection error ({base_url}): {str(e)}")
             
-            logger.error(f"AI Service: HTTP error from {base_url} - {error_message}")
-            logger.error(f"AI Service: Request URL was: {url}")
-            raise Exception(f"AI API error ({base_url}): {error_message}")
-        
-        except httpx.RequestError as e:
-            base_url = self._get_base_url()
-            logger.error(f"AI Service: Request error from {base_url} - {type(e).__name__}: {e}")
-            logger.error(f"AI Service: Request URL was: {url}")
-            raise Exception(f"AI API connection error ({base_url}): {str(e)}")
-        
-        except Exception as e:
-            base_url = self._get_base_url()
-            logger.error(f"AI Service: Unexpected error during streaming from {base_url} - {type(e).__name__}: {e}", exc_info=True)
-            logger.error(f"AI Service: Request URL was: {url}")
-            raise
+            except Exception as e:
+                logger.error(f"AI Service: Unexpected error during streaming from {base_url} - {type(e).__name__}: {e}", exc_info=True)
+                logger.error(f"AI Service: Request URL was: {url}")
+                raise
+            
+            finally:
+                self._release()
     
     async def _handle_streaming_response(self, response, base_url: str, url: str) -> AsyncIterator[str]:
         """Handle streaming SSE response."""
         # Log detailed response if enabled
         self._log_detailed_response(
             response.status_code,
-            dict(response.headers),
+            response.headers,
             is_stream=True
         )
         
-        # Log response status
-        logger.info(f"AI Service: Received response with status {response.status_code}")
-        
         # Check status before processing stream
         if response.status_code >= 400:
             # Read error response content
@@ -368,43 +510,54 @@ Be specific and practical."""
         chunk_count = 0
         total_chars = 0
         first_line = True
-        error_detected = False
         
-        async for line in response.aiter_lines():
-            if not line.strip():
+        async for line in _iter_sse_lines(response):
+            line = line.strip()
+            if not line:
                 continue
             
+            is_data = line.startswith(_SSE_DATA_PREFIX)
+            
             # Check first non-empty line for error messages (some proxies return errors in plain text)
             if first_line:
                 first_line = False
-                line_lower = line.lower()
                 # Check for common error patterns even if status is 200
-                if any(keyword in line_lower for keyword in ["error", "unexpected", "not found", "invalid", "failed"]):
-                    # This might be an error message, try to parse it
-                    if not line.startswith("data: "):
-                        # Plain text error (not SSE format)
-                        logger.error(f"AI Service: Error message in response from {base_url}: {line}")
-                        raise Exception(f"AI API error ({base_url}): {line}")
-            
-            if line.startswith("data: "):
-                data_str = line[6:]  # Remove "data: " prefix
+                if not is_data and _ERROR_KEYWORDS_RE.search(line):
+                    # Plain text error (not SSE format)
+                    text = line.decode("utf-8", errors="replace")
+                    logger.error(f"AI Service: Error message in response from {base_url}: {text}")
+                    raise Exception(f"AI API error ({base_url}): {text}")
+            
+            if is_data:
+                data_bytes = line[len(_SSE_DATA_PREFIX):]
                 
-                if data_str == "[DONE]":
-                    logger.debug(f"AI Service: Stream completed - received {chunk_count} chunks, {total_chars} characters")
+                if data_bytes == _SSE_DONE:
+                    logger.debug("AI Service: Stream completed - received %d chunks, %d characters", chunk_count, total_chars)
                     break
                 
                 try:
-                    data = json.loads(data_str)
+                    # Fast path: pull the delta content straight out of the frame
+                    if b'"error"' not in data_bytes and b'"message"' not in data_bytes:
+                        match = _DELTA_CONTENT_RE.search(data_bytes)
+                        if match:
+                            content_chunk = orjson.loads(b'"' + match.group(1) + b'"')
+                            if content_chunk:
+                                chunk_count += 1
+                                total_chars += len(content_chunk)
+                                yield content_chunk
+                            continue
+                    
+                    data = orjson.loads(data_bytes)
                     
                     # Check for errors in the response
                     if "error" in data:
-                        error_detected = True
                         error_msg = data["error"]
                         if isinstance(error_msg, dict):
-                            error_msg = error_msg.get("message", str(error_msg))
+                            error_msg = error_msg.get("message", error_msg)
+                        error_msg = str(error_msg)
                         
                         # Add helpful hint for endpoint errors
-                        if "endpoint" in str(error_msg).lower() or "unexpected" in str(error_msg).lower():
+                        if _ENDPOINT_ERROR_RE.search(error_msg):
                             if "/v1" not in base_url:
                                 error_msg = (
                                     f"{error_msg}. "
@@ -417,10 +570,10 @@ Be specific and practical."""
                         raise Exception(f"AI API error ({base_url}): {error_msg}")
                     
                     # Check for error-like patterns in the data structure
-                    if isinstance(data, dict):
+                    # (normal delta frames carry "choices", so they skip this)
+                    if isinstance(data, dict) and "choices" not in data:
                         # Some APIs return errors in different formats
-                        if "message" in data and any(keyword in str(data["message"]).lower() for keyword in ["error", "unexpected", "not found", "invalid"]):
-                            error_detected = True
+                        if "message" in data and _ERROR_MESSAGE_RE.search(str(data["message"])):
                             error_msg = data["message"]
                             logger.error(f"AI Service: Error message detected in response from {base_url}: {error_msg}")
                             raise Exception(f"AI API error ({base_url}): {error_msg}")
@@ -435,59 +588,59 @@ Be specific and practical."""
                             total_chars += len(content_chunk)
                             yield content_chunk
                 
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
+                    data_str = data_bytes.decode("utf-8", errors="replace")
                     # If we can't parse JSON and it looks like an error, raise it
-                    if any(keyword in data_str.lower() for keyword in ["error", "unexpected", "not found", "invalid", "failed"]):
+                    if _ERROR_KEYWORDS_RE.search(data_bytes):
                         logger.error(f"AI Service: Error message in non-JSON response from {base_url}: {data_str}")
                         raise Exception(f"AI API error ({base_url}): {data_str}")
                     
                     logger.warning(f"AI Service: Failed to parse SSE chunk: {e}")
-                    logger.debug(f"AI Service: Problematic data: {data_str[:200]}")
+                    logger.debug("AI Service: Problematic data: %.200s", data_str)
                     continue
         
-        # If we got a 200 response but no content chunks and no error was detected, something might be wrong
-        if chunk_count == 0 and not error_detected and response.status_code == 200:
+        # If we got a 200 response but no content chunks, something might be wrong
+        # (detected errors raise above, so they never reach this point)
+        if chunk_count == 0 and response.status_code == 200:
             logger.warning(f"AI Service: Received 200 response but no content chunks were yielded")
             # Don't raise here as some APIs might legitimately return empty responses
         
-        logger.info(f"AI Service: Streaming analysis complete - {chunk_count} chunks, {total_chars} characters")
+        logger.info(f"AI Service: Streaming analysis complete - status {response.status_code}, {chunk_count} chunks, {total_chars} characters")
     
     async def _handle_non_streaming_response(self, response, base_url: str, url: str) -> AsyncIterator[str]:
         """Handle non-streaming JSON response."""
         # Log detailed response if enabled
         response_body = await response.aread()
-        response_text = response_body.decode('utf-8', errors='ignore') if response_body else ""
         
         self._log_detailed_response(
             response.status_code,
-            dict(response.headers),
-            response_text
+            response.headers,
+            response_body
         )
         
-        # Log response status
-        logger.info(f"AI Service: Received response with status {response.status_code}")
-        
         # Check status before processing
         if response.status_code >= 400:
+            response_text = response_body.decode('utf-8', errors='ignore')
             logger.error(f"AI Service: HTTP error {response.status_code} from {base_url}: {response_text}")
             raise Exception(f"AI API error ({base_url}): {response.status_code} - {response_text}")
         
         # Parse JSON response
         try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(response_body)
+        except orjson.JSONDecodeError as e:
             logger.error(f"AI Service: Failed to parse JSON response from {base_url}: {e}")
-            logger.error(f"AI Service: Response text: {response_text[:500]}")
+            logger.error(f"AI Service: Response text: {response_body[:500].decode('utf-8', errors='ignore')}")
             raise Exception(f"AI API error ({base_url}): Invalid JSON response - {str(e)}")
         
         # Check for errors in the response
         if "error" in data:
             error_msg = data["error"]
             if isinstance(error_msg, dict):
-                error_msg = error_msg.get("message", str(error_msg))
+                error_msg = error_msg.get("message", error_msg)
+            error_msg = str(error_msg)
             
             # Add helpful hint for endpoint errors
-            if "endpoint" in str(error_msg).lower() or "unexpected" in str(error_msg).lower():
+            if _ENDPOINT_ERROR_RE.search(error_msg):
                 if "/v1" not in base_url:
                     error_msg = (
                         f"{error_msg}. "
@@ -504,19 +657,16 @@ Be specific and practical."""
             message = data["choices"][0].get("message", {})
             content = message.get("content", "")
             
-            if content:
-                # Yield the complete content (maintains async iterator interface)
-                # For backward compatibility, we yield it as a single chunk
-                logger.info(f"AI Service: Received complete response ({len(content)} characters)")
-                yield content
-            else:
+            if not content:
                 logger.warning(f"AI Service: No content in response from {base_url}")
-                yield ""
+                content = ""
         else:
             logger.warning(f"AI Service: No choices in response from {base_url}")
-            yield ""
+            content = ""
         
-        logger.info(f"AI Service: Non-streaming analysis complete")
+        logger.info(f"AI Service: Non-streaming analysis complete - status {response.status_code}, {len(content)} characters")
+        # Yield the complete content as a single chunk (maintains async iterator interface)
+        yield content
     
     async def analyze(
         self,
@@ -537,11 +687,30 @@ Be specific and practical."""
         Returns:
             Complete AI response
         """
-        chunks = []
-        async for chunk in self.analyze_stream(content, prompt_type, custom_prompt, variables):
-            chunks.append(chunk)
+        # list + join is the cheapest way to assemble str chunks (faster than StringIO or bytearray)
+        return "".join([chunk async for chunk in self.analyze_stream(content, prompt_type, custom_prompt, variables)])
+    
+    async def analyze_many(
+        self,
+        items: list[Tuple[str, str]],
+        custom_prompt: Optional[str] = None,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> list[Any]:
+        """
+        Analyze several contents concurrently (at most AI_MAX_CONCURRENT_REQUESTS in flight).
         
-        return "".join(chunks)
+        Args:
+            items: (content, prompt_type) pairs to analyze
+            custom_prompt: Custom prompt template applied to every item
+            variables: Variables for prompt substitution applied to every item
+            
+        Returns:
+            One entry per item, in order: the complete AI response, or the exception it raised
+        """
+        return await asyncio.gather(
+            *(self.analyze(content, prompt_type, custom_prompt, variables) for content, prompt_type in items),
+            return_exceptions=True
+        )
     
     async def test_connection(self) -> tuple[bool, str]:
         """
@@ -550,117 +719,112 @@ Be specific and practical."""
         Returns:
             Tuple of (success: bool, message: str)
         """
-        from app.core.config import AIConfig
-        if not AIConfig.is_configured():
+        if not self._is_configured():
             logger.warning("AI Service: Test connection failed - service not configured")
             return False, "AI service not configured (missing API key or disabled)"
         
+        # Bind one config snapshot for the whole request (exception handlers included)
+        config = self.config
+        base_url = config.base_url
+        model = config.model
+        
+        client = self._acquire()
         try:
-            # Get config values from AIConfig
-            base_url = self._get_base_url()
-            model = self._get_model()
-            
             # Simple test with minimal content
             test_prompt = "Respond with 'OK' if you can read this."
-            # Normalize base URL to ensure /v1 suffix
-            base_url_clean = self._normalize_base_url(base_url)
-            url = f"{base_url_clean}/chat/completions"
+            url = _api_url(base_url, "chat/completions")
             
             logger.info(f"AI Service: Testing connection to {url}")
-            logger.debug(f"AI Service: Test using model={model}")
+            logger.debug("AI Service: Test using model=%s", model)
             
-            async with httpx.AsyncClient(timeout=10) as client:
-                headers = self._build_headers()
-                
-                payload = {
-                    "model": model,
-                    "messages": [{"role": "user", "content": test_prompt}],
-                    "max_tokens": 10
-                }
-                
-                # Log detailed request if enabled
-                self._log_detailed_request("POST", url, headers, payload)
-                
-                response = await client.post(url, headers=headers, json=payload)
-                
-                logger.info(f"AI Service: Test connection received status {response.status_code}")
-                
-                # Read response body once for logging and parsing
-                response_body = await response.aread()
-                response_text = response_body.decode('utf-8', errors='ignore') if response_body else ""
-                
-                # Log detailed response if enabled
-                if self._is_detailed_logging_enabled():
-                    self._log_detailed_response(
-                        response.status_code,
-                        dict(response.headers),
-                        response_text
-                    )
-                
-                # Check for common configuration errors
-                if response.status_code == 404:
-                    error_str = response_text
-                    logger.error(f"AI Service: Test connection failed (404) - {error_str[:200]}")
-                    
-                    # Check if it's a missing /v1 issue
-                    if "not found" in error_str.lower() or "endpoint" in error_str.lower():
-                        # Suggest adding /v1 if not present
-                        if "/v1" not in base_url:
-                            return False, (
-                                f"Connection failed (404 Not Found). "
-                                f"Hint: Your base URL might be missing '/v1'. "
-                                f"Try: {base_url}/v1"
-                            )
-                        else:
-                            return False, f"Connection failed (404 Not Found): {error_str[:200]}"
-                    return False, f"Connection failed (404 Not Found): {error_str[:200]}"
-                
-                # Check for other errors
-                if response.status_code >= 400:
-                    error_str = response_text
-                    logger.error(f"AI Service: Test connection failed ({response.status_code}) - {error_str[:200]}")
-                    return False, f"Connection failed ({response.status_code}): {error_str[:200]}"
-                
-                response.raise_for_status()
+            payload = {
+                "model": model,
+                "messages": [{"role": "user", "content": test_prompt}],
+                "max_tokens": 10
+            }
+            
+            # Log detailed request if enabled
+            self._log_detailed_request("POST", url, payload)
+            
+            response = await client.post(url, content=orjson.dumps(payload), timeout=_PROBE_TIMEOUT)
+            
+            logger.info(f"AI Service: Test connection received status {response.status_code}")
+            
+            # Read response body once; it is parsed as bytes and only decoded for error messages
+            response_body = await response.aread()
+            
+            # Log detailed response if enabled
+            self._log_detailed_response(
+                response.status_code,
+                response.headers,
+                response_body
+            )
+            
+            # Check for common configuration errors
+            if response.status_code == 404:
+                error_str = response_body.decode('utf-8', errors='ignore')
+                logger.error(f"AI Service: Test connection failed (404) - {error_str[:200]}")
                 
-                # Parse response to verify it's valid (use the text we already read)
-                try:
-                    data = json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    logger.error(f"AI Service: Could not parse response JSON: {e}")
-                    return False, f"Invalid response format: {str(e)}"
-                if "error" in data:
-                    error_msg = data["error"]
-                    if isinstance(error_msg, dict):
-                        error_msg = error_msg.get("message", str(error_msg))
-                    
-                    logger.error(f"AI Service: Test connection returned error from {base_url} - {error_msg}")
-                    
-                    # Check if it's an endpoint error
-                    if "endpoint" in str(error_msg).lower() and "/v1" not in base_url:
+                # Check if it's a missing /v1 issue
+                if _MISSING_ENDPOINT_RE.search(error_str):
+                    # Suggest adding /v1 if not present
+                    if "/v1" not in base_url:
                         return False, (
-                            f"API error ({base_url}): {error_msg}. "
-                            f"Hint: Try adding '/v1' to your base URL: {base_url}/v1"
+                            f"Connection failed (404 Not Found). "
+                            f"Hint: Your base URL might be missing '/v1'. "
+                            f"Try: {base_url}/v1"
                         )
-                    return False, f"API error ({base_url}): {error_msg}"
+                    else:
+                        return False, f"Connection failed (404 Not Found): {error_str[:200]}"
+                return False, f"Connection failed (404 Not Found): {error_str[:200]}"
+            
+            # Check for other errors
+            if response.status_code >= 400:
+                error_str = response_body.decode('utf-8', errors='ignore')
+                logger.error(f"AI Service: Test connection failed ({response.status_code}) - {error_str[:200]}")
+                return False, f"Connection failed ({response.status_code}): {error_str[:200]}"
+            
+            response.raise_for_status()
+            
+            # Parse response to verify it's valid (use the bytes we already read)
+            try:
+                data = orjson.loads(response_body)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"AI Service: Could not parse response JSON: {e}")
+                return False, f"Invalid response format: {str(e)}"
+            if "error" in data:
+                error_msg = data["error"]
+                if isinstance(error_msg, dict):
+                    error_msg = error_msg.get("message", error_msg)
+                error_msg = str(error_msg)
                 
-                logger.info(f"AI Service: Test connection successful - model={model}")
-                return True, f"Connection successful (model: {model})"
-        
+                logger.error(f"AI Service: Test connection returned error from {base_url} - {error_msg}")
+                
+                # Check if it's an endpoint error
+                if "/v1" not in base_url and _ENDPOINT_RE.search(error_msg):
+                    return False, (
+                        f"API error ({base_url}): {error_msg}. "
+                        f"Hint: Try adding '/v1' to your base URL: {base_url}/v1"
+                    )
+                return False, f"API error ({base_url}): {error_msg}"
+            
+            logger.info(f"AI Service: Test connection successful - model={model}")
+            return True, f"Connection successful (model: {model})"
+    
         except httpx.HTTPStatusError as e:
-            base_url = self._get_base_url()
             logger.error(f"AI Service: Test connection HTTP status error from {base_url} - {e.response.status_code}: {e.response.text[:100]}")
             return False, f"HTTP error ({base_url}): {e.response.status_code} - {e.response.text[:100]}"
         
         except httpx.RequestError as e:
-            base_url = self._get_base_url()
             logger.error(f"AI Service: Test connection request error from {base_url} - {type(e).__name__}: {e}")
             return False, f"Connection error ({base_url}): {str(e)}"
         
         except Exception as e:
-            base_url = self._get_base_url()
             logger.error(f"AI Service: Test connection unexpected error from {base_url} - {type(e).__name__}: {e}", exc_info=True)
             return False, f"Unexpected error ({base_url}): {str(e)}"
+        
+        finally:
+            self._release()
     
     async def get_available_models(self) -> list[str]:
         """
@@ -669,99 +833,236 @@ Be specific and practical."""
         Returns:
             List of model IDs available on the server
         """
-        from app.core.config import AIConfig
-        if not AIConfig.is_configured():
+        if not self._is_configured():
             logger.warning("AI Service: Cannot fetch models - service not configured")
             return []
         
+        # Bind one config snapshot for the whole request (exception handlers included)
+        config = self.config
+        base_url = config.base_url
+        
+        client = self._acquire()
         try:
-            base_url = self._get_base_url()
-            # Normalize base URL to ensure /v1 suffix
-            base_url_clean = self._normalize_base_url(base_url)
-            url = f"{base_url_clean}/models"
+            url = _api_url(base_url, "models")
+            
+            cache_key = (url, config.api_key)
+            cached = _models_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < MODELS_CACHE_TTL_SECONDS:
+                logger.debug("AI Service: Using cached models for %s (%d models)", url, len(cached[1]))
+                return list(cached[1])
+            
             logger.info(f"AI Service: Fetching available models from {url}")
             
-            async with httpx.AsyncClient(timeout=10) as client:
-                headers = self._build_headers()
-                
-                # Log detailed request if enabled
-                self._log_detailed_request("GET", url, headers)
-                
-                response = await client.get(url, headers=headers)
-                
-                # Read response body once for logging and parsing
-                response_body = await response.aread()
-                response_text = response_body.decode('utf-8', errors='ignore') if response_body else ""
-                
-                # Log detailed response if enabled
-                if self._is_detailed_logging_enabled():
-                    self._log_detailed_response(
-                        response.status_code,
-                        dict(response.headers),
-                        response_text
-                    )
-                
-                if response.status_code == 404:
-                    base_url = self._get_base_url()
-                    logger.warning(f"AI Service: Server does not support /models endpoint (404) from {base_url}")
-                    return []
-                
-                response.raise_for_status()
-                
-                # Parse JSON from the text we already read
-                try:
-                    data = json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    base_url = self._get_base_url()
-                    logger.warning(f"AI Service: Could not parse response JSON from {base_url}: {e}")
-                    return []
-                
-                # OpenAI format: { "object": "list", "data": [{"id": "model-name", ...}] }
-                if "data" in data and isinstance(data["data"], list):
-                    models = [m["id"] for m in data["data"] if "id" in m]
-                    logger.info(f"AI Service: Found {len(models)} models")
-                    logger.debug(f"AI Service: Models: {models}")
-                    return models
-                
-                logger.warning(f"AI Service: Unexpected response format: {data}")
+            # Log detailed request if enabled
+            self._log_detailed_request("GET", url)
+            
+            response = await client.get(url, timeout=_PROBE_TIMEOUT)
+            
+            # Read response body once; it is parsed as bytes and only decoded for error messages
+            response_body = await response.aread()
+            
+            # Log detailed response if enabled
+            self._log_detailed_response(
+                response.status_code,
+                response.headers,
+                response_body
+            )
+            
+            if response.status_code == 404:
+                logger.warning(f"AI Service: Server does not support /models endpoint (404) from {base_url}")
                 return []
-        
+            
+            response.raise_for_status()
+            
+            # Parse JSON from the bytes we already read
+            try:
+                data = orjson.loads(response_body)
+            except orjson.JSONDecodeError as e:
+                logger.warning(f"AI Service: Could not parse response JSON from {base_url}: {e}")
+                return []
+            
+            # OpenAI format: { "object": "list", "data": [{"id": "model-name", ...}] }
+            if "data" in data and isinstance(data["data"], list):
+                models = [m["id"] for m in data["data"] if "id" in m]
+                if models:
+                    _models_cache[cache_key] = (time.monotonic(), models)
+                logger.info(f"AI Service: Found {len(models)} models")
+                logger.debug("AI Service: Models: %s", models)
+                return models
+            
+            logger.warning(f"AI Service: Unexpected response format: {data}")
+            return []
+    
         except httpx.HTTPStatusError as e:
-            base_url = self._get_base_url()
             logger.warning(f"AI Service: HTTP error fetching models from {base_url} - {e.response.status_code}")
             return []
         
         except httpx.RequestError as e:
-            base_url = self._get_base_url()
             logger.warning(f"AI Service: Request error fetching models from {base_url} - {type(e).__name__}: {e}")
             return []
         
         except Exception as e:
-            base_url = self._get_base_url()
             logger.error(f"AI Service: Unexpected error fetching models from {base_url} - {type(e).__name__}: {e}", exc_info=True)
             return []
+        
+        finally:
+            self._release()
 
 
-# Global AI service instance
-_ai_service: Optional[AIService] = None
+_AI_SERVICE_POOL_SIZE = 4
+_CFG_CHANGED_FMT = "AI Service: Config changed (base_url: %s -> %s, model: %s -> %s)"
+_pending_closes: set = set()
 
 
-def get_ai_service() -> AIService:
+def _close_client(client: httpx.AsyncClient) -> None:
+    """Close a detached HTTP client in the background (if an event loop is running)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop to await on; the client is released when garbage collected
+        return
+    task = loop.create_task(client.aclose())
+    _pending_closes.add(task)
+    task.add_done_callback(_log_close_failure)
+
+
+def _log_close_failure(task: asyncio.Task) -> None:
+    _pending_closes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("AI Service: Failed to close HTTP client: %s", task.exception())
+
+
+class _AIServiceRegistry:
     """
-    Get the singleton AIService instance.
-    Since AIService is stateless and reads directly from AIConfig,
-    we can use a simple singleton pattern without comparison logic.
+    Holds the active AIService plus a few recently used ones,
+    so switching back to a recent config reuses its warm connections.
     """
-    global _ai_service
     
-    if _ai_service is None:
-        logger.debug("AI Service: Creating new service instance")
-        _ai_service = AIService()
+    __slots__ = ("current", "pool", "lock")
+    
+    def __init__(self):
+        self.current: Optional[AIService] = None
+        self.pool: "OrderedDict[Tuple[str, str, int], AIService]" = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self) -> AIService:
+        """
+        Get the active AIService.
+        
+        Fast path is a single lock-free int compare against AIConfig._version.
+        After a change, the current instance is kept if AIConfig still hands out the
+        same snapshot object; otherwise the snapshot is looked up in the pool under
+        the lock (double-checked).
+        """
+        svc = self.current
+        if svc is not None and svc._cfg_version == AIConfig._version:
+            return svc
+        
+        with self.lock:
+            svc = self.current
+            if svc is not None and svc._cfg_version == AIConfig._version:
+                return svc
+            
+            # Read the version before the snapshot is built: if it changes meanwhile, the
+            # service is stamped with the older version and refreshed on the next call
+            version = AIConfig._version
+            snapshot = AIConfig.snapshot()
+            if svc is None or svc.config is not snapshot:
+                previous = svc.config if svc is not None else None
+                svc = self._get_pooled(snapshot)
+                if previous is not None:
+                    logger.info(_CFG_CHANGED_FMT, previous.base_url, snapshot.base_url, previous.model, snapshot.model)
+            svc._cfg_version = version
+            self.current = svc
+            return svc
     
-    return _ai_service
+    def _get_pooled(self, config: AIConfigSnapshot) -> AIService:
+        """
+        Get the pooled AIService for a config snapshot, building it (and evicting the LRU one) if needed.
+        
+        Services are pooled by connection settings; a model/max_tokens/temperature/streaming
+        change is applied to the existing service instead of building a new HTTP client.
+        """
+        key = config.connection_key
+        svc = self.pool.get(key)
+        if svc is not None:
+            self.pool.move_to_end(key)
+            current = svc.config
+            if current is not config and (current.content_hash != config.content_hash or current != config):
+                svc.apply_call_settings(config)
+            return svc
+        
+        svc = AIService(config)
+        logger.debug("AI Service: Created new service instance (base_url=%r, model=%r)", svc.base_url, svc.model)
+        self.pool[key] = svc
+        if len(self.pool) > _AI_SERVICE_POOL_SIZE:
+            _, evicted = self.pool.popitem(last=False)
+            evicted._retire()
+        return svc
+    
+    def reset(self) -> None:
+        """Drop all pooled AIService instances and close their HTTP clients once idle."""
+        with self.lock:
+            self.current = None
+            while self.pool:
+                self.pool.popitem()[1]._retire()
+            # Callers reset after assigning AIConfig fields directly
+            AIConfig.mark_changed()
+    
+    async def aclose(self) -> None:
+        """Close the HTTP clients of all pooled services and wait for pending background closes."""
+        with self.lock:
+            self.current = None
+            services = list(self.pool.values())
+            self.pool.clear()
+        for svc in services:
+            await svc.aclose()
+        if _pending_closes:
+            await asyncio.gather(*_pending_closes, return_exceptions=True)
+
+
+_registry = _AIServiceRegistry()
+
+
+def get_ai_service() -> AIService:
+    """Get the AIService for the active AIConfig."""
+    # Same fast path as _AIServiceRegistry.get, inlined to skip the method call
+    registry = _registry
+    svc = registry.current
+    if svc is not None and svc._cfg_version == AIConfig._version:
+        return svc
+    return registry.get()
 
 
 def reset_ai_service():
-    global _ai_service
-    _ai_service = None
+    """Drop all pooled AIService instances and close their HTTP clients once idle."""
+    _registry.reset()
+
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+def start_ai_warmup() -> None:
+    """
+    Prefetch the model list for the active config in the background (called on app startup).
+    
+    Opens the active service's connection ahead of the first analysis and fills the
+    models cache used by the settings page. Only the free GET /models probe is used;
+    test_connection would spend tokens on a completion at every boot.
+    """
+    global _warmup_task
+    if not AIConfig.is_configured():
+        return
+    _warmup_task = asyncio.get_running_loop().create_task(_warmup())
+
+
+async def _warmup() -> None:
+    models = await get_ai_service().get_available_models()
+    logger.info("AI Service: Warmup complete - %d models available", len(models))
+
 
+async def close_ai_services() -> None:
+    """Close all pooled HTTP clients (called on app shutdown)."""
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    await _registry.aclose()
@@ -1,13 +1,24 @@
 import os
+import stat
+import codecs
+import functools
+import hashlib
+import itertools
 import mmap
+import struct
 import zipfile
 import tempfile
 import shutil
 from pathlib import Path
-from typing import List, Iterator, Optional, Tuple
+from typing import List, Dict, Iterator, AsyncIterator, Optional, Tuple, FrozenSet
 import logging
 import re
 import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import ZipSecurityConfig
 
@@ -19,12 +30,55 @@ class CancelledError(Exception):
     pass
 
 
+# read_file_chunks checks for cancellation once per this many bytes read
+CANCELLATION_CHECK_BYTES = 16 * 1024 * 1024
+
+# Buffer size for line reads (fewer read syscalls than the 8KB default)
+LINE_READ_BUFFER_SIZE = 1024 * 1024
+
+# read_file reads files smaller than this with a single os.read call
+SMALL_FILE_MAX_SIZE = 1024 * 1024
+
+# Max copy buffer when extracting a zip member (copyfileobj defaults to 64KB)
+EXTRACT_BUFFER_SIZE = 1024 * 1024
+
+# Whole-file reads smaller than this are usually already cached; skip the extra syscall
+FADVISE_MIN_SIZE = 10 * 1024 * 1024
+
+# Uncompressed zip members at least this large are read through mmap instead of ZipExtFile
+MMAP_STORED_MIN_SIZE = 10 * 1024 * 1024
+
+
+# Dedicated pool for blocking file I/O, so large reads and folder scans don't
+# starve the loop's default executor (shared with DNS lookups, run_in_executor, ...)
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=min(64, (os.cpu_count() or 4) * 8), thread_name_prefix="file-io")
+
+
+async def _run_io(func, *args):
+    """Run a blocking file I/O call on the file I/O pool."""
+    return await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, func, *args)
+
+
+def _advise_sequential(fd: int) -> None:
+    """
+    Hint the kernel that fd will be read sequentially so it widens readahead.
+    
+    No-op on platforms without posix_fadvise (e.g. macOS, Windows).
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            # Advisory only (some filesystems/pipes reject it)
+            pass
+
+
 async def read_file(file_path: str) -> str:
     """
     Read file content asynchronously.
     
-    For large files (>10MB), this uses memory-mapped files for efficiency.
-    For smaller files, reads normally for simplicity.
+    The file is read into a buffer presized from its stat size and decoded once
+    (invalid UTF-8 is dropped). Content is returned as-is, without newline translation.
 
     Args:
         file_path: Path to the file
@@ -40,20 +94,21 @@ async def read_file(file_path: str) -> str:
         raise ValueError(f"Invalid or inaccessible file path: {file_path}")
 
     try:
-        file_size = os.path.getsize(file_path)
-        if file_size > 10 * 1024 * 1024:
-            return await _read_file_mmap(file_path)
-        else:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
+        # Run the blocking read in a worker thread so large files don't stall the event loop
+        return await _run_io(_read_file_sync, file_path)
     except Exception as e:
         logger.error(f"Error reading file {file_path}: {e}")
         raise
 
 
-async def _read_file_mmap(file_path: str) -> str:
+def _read_file_sync(file_path: str) -> str:
     """
-    Read large file using memory-mapped file for efficiency.
+    Read a whole file with unbuffered readinto calls into one preallocated bytearray.
+    
+    Avoids the intermediate bytes copy of read() (and the page-fault driven reads of mmap),
+    so the only other full-size allocation is the decoded string. Files under
+    SMALL_FILE_MAX_SIZE are read with a single os.read instead, where the copy is
+    cheaper than the file object and buffer setup.
     
     Args:
         file_path: Path to the file
@@ -61,16 +116,45 @@ async def _read_file_mmap(file_path: str) -> str:
     Returns:
         File content as string
     """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
     try:
-        with open(file_path, "rb") as f:
-            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                return mm.read().decode("utf-8", errors="ignore")
-    except Exception as e:
-        logger.error(f"Error reading file with mmap {file_path}: {e}")
-        raise
+        size = os.fstat(fd).st_size
+        if size < SMALL_FILE_MAX_SIZE:
+            # Ask for one extra byte: getting exactly size bytes means we hit EOF
+            data = os.read(fd, size + 1)
+            if len(data) != size:
+                # Short read, or the file changed since the stat: read to EOF
+                parts = [data]
+                while data:
+                    data = os.read(fd, 65536)
+                    parts.append(data)
+                data = b"".join(parts)
+            return data.decode("utf-8", errors="ignore")
+    finally:
+        os.close(fd)
+    
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= FADVISE_MIN_SIZE:
+            _advise_sequential(f.fileno())
+        buf = bytearray(size)
+        with memoryview(buf) as view:
+            offset = 0
+            while offset < size:
+                n = f.readinto(view[offset:])
+                if not n:
+                    break
+                offset += n
+        if offset < size:
+            # File shrank while reading
+            del buf[offset:]
+        else:
+            # Pick up anything appended since the stat
+            buf += f.read()
+    return buf.decode("utf-8", errors="ignore")
 
 
-def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_event: Optional[asyncio.Event] = None) -> Iterator[str]:
+def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_event: Optional[asyncio.Event] = None) -> Iterator[bytes]:
     """
     Read file in chunks for efficient memory usage.
     
@@ -80,8 +164,9 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
     This is a generator that yields chunks of the file, useful for
     processing large files without loading everything into memory.
     
-    Uses binary mode for accurate byte-level chunking, then decodes to text.
-    This ensures true 1MB (or specified) byte chunks for better performance.
+    Uses binary mode for accurate byte-level chunking and yields the raw bytes,
+    so consumers that only scan bytes never pay for a decode. Use
+    read_file_text_chunks when text is needed.
     
     Args:
         file_path: Path to the file (regular path or virtual zip path)
@@ -89,7 +174,7 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
         cancellation_event: Optional asyncio.Event to check for cancellation
         
     Yields:
-        String chunks of the file (decoded from bytes)
+        Byte chunks of the file
         
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -99,6 +184,10 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
     if not validate_file_path(file_path):
         raise ValueError(f"Invalid or inaccessible file path: {file_path}")
     
+    # Check for cancellation every ~16MB rather than on every chunk
+    check_interval = max(1, CANCELLATION_CHECK_BYTES // chunk_size)
+    is_cancelled = cancellation_event.is_set if cancellation_event else None
+    
     # Check if it's a virtual zip path
     zip_path_info = parse_zip_path(file_path)
     if zip_path_info:
@@ -106,32 +195,28 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
         logger.debug(f"FileHandler: Reading chunks from zip file: {zip_path}::{internal_path}")
         
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            with _open_zip(zip_path) as zip_ref:
                 # Sanitize and find file
                 sanitized_path = sanitize_zip_path(internal_path)
-                try:
-                    zip_info = zip_ref.getinfo(sanitized_path)
-                except KeyError:
-                    # Try case-insensitive search
-                    found = False
-                    for name in zip_ref.namelist():
-                        if sanitize_zip_path(name).lower() == sanitized_path.lower():
-                            sanitized_path = name
-                            zip_info = zip_ref.getinfo(name)
-                            found = True
-                            break
-                    if not found:
-                        raise FileNotFoundError(f"File {internal_path} not found in {zip_path}")
+                zip_info = _find_zip_member(zip_ref, zip_path, sanitized_path)
+                if zip_info is None:
+                    raise FileNotFoundError(f"File {internal_path} not found in {zip_path}")
+                sanitized_path = zip_info.filename
                 
                 # Validate security
                 is_valid, error_msg = validate_zip_file_security(zip_path, zip_info, 0, 0, 0)
                 if not is_valid:
                     raise ValueError(f"Security validation failed: {error_msg}")
                 
-                # Read in chunks
-                with zip_ref.open(sanitized_path, 'r') as file_in_zip:
+                # Read in chunks (large stored members straight from a memory map)
+                if _use_mmap_for(zip_info):
+                    opener = _mmap_stored_entry(zip_path, zip_info)
+                else:
+                    opener = zip_ref.open(sanitized_path, 'r')
+                with opener as file_in_zip:
+                    count = 0
                     while True:
-                        if cancellation_event and cancellation_event.is_set():
+                        if is_cancelled is not None and count % check_interval == 0 and is_cancelled():
                             logger.info(f"FileHandler: Reading {file_path} cancelled")
                             raise CancelledError(f"File reading cancelled: {file_path}")
                         
@@ -139,12 +224,8 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
                         if not chunk_bytes:
                             break
                         
-                        if cancellation_event and cancellation_event.is_set():
-                            logger.info(f"FileHandler: Reading {file_path} cancelled")
-                            raise CancelledError(f"File reading cancelled: {file_path}")
-                        
-                        chunk = chunk_bytes.decode("utf-8", errors="ignore")
-                        yield chunk
+                        yield chunk_bytes
+                        count += 1
         except CancelledError:
             raise
         except Exception as e:
@@ -154,9 +235,11 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
     
     # Regular file reading
     with open(file_path, "rb") as f:
+        _advise_sequential(f.fileno())
+        count = 0
         while True:
-            # Check for cancellation before reading next chunk
-            if cancellation_event and cancellation_event.is_set():
+            # Check for cancellation before reading the next batch of chunks
+            if is_cancelled is not None and count % check_interval == 0 and is_cancelled():
                 logger.info(f"FileHandler: Reading {file_path} cancelled")
                 raise CancelledError(f"File reading cancelled: {file_path}")
             
@@ -164,14 +247,89 @@ def read_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_eve
             if not chunk_bytes:
                 break
             
-            # Check for cancellation after reading chunk (before yielding)
-            if cancellation_event and cancellation_event.is_set():
-                logger.info(f"FileHandler: Reading {file_path} cancelled")
-                raise CancelledError(f"File reading cancelled: {file_path}")
-            
-            # Decode the bytes to string (handles UTF-8 with error recovery)
-            chunk = chunk_bytes.decode("utf-8", errors="ignore")
+            yield chunk_bytes
+            count += 1
+
+
+def read_file_text_chunks(file_path: str, chunk_size: int = 1048576, cancellation_event: Optional[asyncio.Event] = None) -> Iterator[str]:
+    """
+    Read file in chunks decoded as UTF-8 text.
+    
+    Wraps read_file_chunks with an incremental decoder, so a multi-byte
+    character split across a chunk boundary is decoded intact instead of dropped.
+    
+    Args:
+        file_path: Path to the file (regular path or virtual zip path)
+        chunk_size: Size of each chunk in bytes (default: 1MB)
+        cancellation_event: Optional asyncio.Event to check for cancellation
+        
+    Yields:
+        String chunks of the file (invalid UTF-8 bytes are ignored)
+        
+    Raises:
+        CancelledError: If operation is cancelled
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    for chunk_bytes in read_file_chunks(file_path, chunk_size, cancellation_event):
+        chunk = decoder.decode(chunk_bytes, final=False)
+        if chunk:
             yield chunk
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def aread_file_chunks(file_path: str, chunk_size: int = 1048576, cancellation_event: Optional[asyncio.Event] = None) -> AsyncIterator[bytes]:
+    """
+    Async variant of read_file_chunks for use inside the event loop.
+    
+    Each chunk is read in a worker thread, so reading a large file never blocks
+    the loop and every chunk boundary is a point where other tasks can run.
+    
+    Args:
+        file_path: Path to the file (regular path or virtual zip path)
+        chunk_size: Size of each chunk in bytes (default: 1MB)
+        cancellation_event: Optional asyncio.Event to check for cancellation
+        
+    Yields:
+        Byte chunks of the file
+    """
+    async for chunk in _aiter_in_thread(read_file_chunks(file_path, chunk_size, cancellation_event)):
+        yield chunk
+
+
+async def aread_file_text_chunks(file_path: str, chunk_size: int = 1048576, cancellation_event: Optional[asyncio.Event] = None) -> AsyncIterator[str]:
+    """
+    Async variant of read_file_text_chunks for use inside the event loop.
+    
+    Reading and decoding happen in a worker thread; cancelling the consuming
+    task raises asyncio.CancelledError at the next chunk boundary.
+    
+    Args:
+        file_path: Path to the file (regular path or virtual zip path)
+        chunk_size: Size of each chunk in bytes (default: 1MB)
+        cancellation_event: Optional asyncio.Event to check for cancellation
+        
+    Yields:
+        String chunks of the file (invalid UTF-8 bytes are ignored)
+    """
+    async for chunk in _aiter_in_thread(read_file_text_chunks(file_path, chunk_size, cancellation_event)):
+        yield chunk
+
+
+async def _aiter_in_thread(gen: Iterator) -> AsyncIterator:
+    """Drive a sync generator on the file I/O pool, one item per await."""
+    try:
+        while True:
+            item = await _run_io(next, gen, None)
+            if item is None:
+                break
+            yield item
+    finally:
+        # If we were cancelled mid-read, the worker thread still owns the generator;
+        # it is then closed when garbage collected
+        if not gen.gi_running:
+            gen.close()
 
 
 def read_file_lines(file_path: str, max_lines: int = None, cancellation_event: Optional[asyncio.Event] = None) -> Iterator[str]:
@@ -184,6 +342,9 @@ def read_file_lines(file_path: str, max_lines: int = None, cancellation_event: O
     This is a generator that yields lines one at a time, preventing
     the entire file from being loaded into memory.
     
+    The generator does blocking I/O; from async code, drive it from a worker
+    thread (e.g. asyncio.to_thread) rather than iterating it on the event loop.
+    
     Args:
         file_path: Path to the file (regular path or virtual zip path)
         max_lines: Maximum number of lines to read (None for all lines)
@@ -197,7 +358,6 @@ def read_file_lines(file_path: str, max_lines: int = None, cancellation_event: O
         PermissionError: If file is not readable
         CancelledError: If operation is cancelled
     """
-    import os
     if not validate_file_path(file_path):
         logger.error(f"FileHandler: Invalid or inaccessible file path: {file_path}")
         raise ValueError(f"Invalid or inaccessible file path: {file_path}")
@@ -225,11 +385,13 @@ def read_file_lines(file_path: str, max_lines: int = None, cancellation_event: O
         file_size_mb = file_size / (1024 * 1024)
         logger.debug(f"FileHandler: Opening file for line-by-line reading: {file_path} ({file_size_mb:.2f} MB)")
         
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        with open(file_path, "r", encoding="utf-8", errors="ignore", buffering=LINE_READ_BUFFER_SIZE) as f:
+            _advise_sequential(f.fileno())
+            is_cancelled = cancellation_event.is_set if cancellation_event else None
             count = 0
             for line in f:
-                # Check for cancellation more frequently (every 1000 lines) for better responsiveness
-                if cancellation_event and count % 1000 == 0 and cancellation_event.is_set():
+                # Check for cancellation every 1024 lines
+                if is_cancelled is not None and (count & 1023) == 0 and is_cancelled():
                     logger.info(f"FileHandler: Reading {file_path} cancelled at line {count}")
                     raise CancelledError(f"File reading cancelled: {file_path}")
                 
@@ -247,7 +409,137 @@ def read_file_lines(file_path: str, max_lines: int = None, cancellation_event: O
         raise
 
 
-async def list_files_in_folder(folder_path: str, recursive: bool = True) -> List[str]:
+# Directories never descended into when listing a folder (hidden directories are skipped too)
+SKIPPED_DIR_NAMES = frozenset({"node_modules", "__pycache__", "venv", "__MACOSX"})
+# OS metadata files never listed (list_zip_contents drops the same ones)
+SKIPPED_FILE_NAMES = frozenset({".DS_Store", "Thumbs.db", "desktop.ini"})
+
+# Max threads used to walk top-level subdirectories (and list zips) of a folder concurrently
+SCAN_MAX_WORKERS = 8
+
+
+def _scan_tree(root: str, recursive: bool = True, skip_dirs: FrozenSet[str] = SKIPPED_DIR_NAMES, prune: bool = True, resolve_links: bool = False) -> List[str]:
+    """
+    List file paths under root using os.scandir.
+    
+    DirEntry caches the file type from the directory listing, so this avoids the extra
+    stat per entry (and the Path objects) of rglob + is_file. Like rglob, symlinked
+    directories are not descended into; symlinks to files are included. With prune,
+    hidden directories and those named in skip_dirs are skipped without being
+    opened, and OS metadata files (SKIPPED_FILE_NAMES) are left out.
+    
+    Args:
+        root: Directory to scan
+        recursive: If True, descend into subdirectories
+        skip_dirs: Directory names to skip (only used with prune)
+        prune: If False, list every file, as rglob does
+        resolve_links: If True, list symlinked files by their target path
+        
+    Returns:
+        List of file paths (unsorted)
+    """
+    skip_files = SKIPPED_FILE_NAMES if prune else frozenset()
+    files = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        if entry.name not in skip_files:
+                            files.append(os.path.realpath(entry.path) if resolve_links and entry.is_symlink() else entry.path)
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if not prune or (name[0] != "." and name not in skip_dirs):
+                            stack.append(entry.path)
+        except PermissionError:
+            if directory == root:
+                raise
+            # Unreadable subdirectories are skipped, as rglob does
+            logger.debug(f"FileHandler: Skipping unreadable directory: {directory}")
+    return files
+
+
+def _scan_subtree(directory: str, skip_dirs: FrozenSet[str], prune: bool = True, resolve_links: bool = False) -> List[str]:
+    """_scan_tree for a subdirectory: an unreadable one is skipped rather than raised."""
+    try:
+        return _scan_tree(directory, True, skip_dirs, prune, resolve_links)
+    except PermissionError:
+        logger.debug(f"FileHandler: Skipping unreadable directory: {directory}")
+        return []
+
+
+def _scan_tree_parallel(root: str, skip_dirs: FrozenSet[str] = SKIPPED_DIR_NAMES, prune: bool = True, resolve_links: bool = False) -> List[str]:
+    """
+    Recursive _scan_tree that walks each top-level subdirectory in its own thread.
+    
+    Directory listing is latency bound on network/FUSE mounts, and os.scandir
+    releases the GIL while waiting, so subtrees are listed concurrently.
+    
+    Args:
+        root: Directory to scan
+        skip_dirs: Directory names to skip (only used with prune)
+        prune: If False, list every file, as rglob does
+        resolve_links: If True, list symlinked files by their target path
+        
+    Returns:
+        List of file paths (unsorted)
+    """
+    skip_files = SKIPPED_FILE_NAMES if prune else frozenset()
+    files = []
+    subdirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file():
+                if entry.name not in skip_files:
+                    files.append(os.path.realpath(entry.path) if resolve_links and entry.is_symlink() else entry.path)
+            elif entry.is_dir(follow_symlinks=False):
+                name = entry.name
+                if not prune or (name[0] != "." and name not in skip_dirs):
+                    subdirs.append(entry.path)
+    
+    if len(subdirs) < 2:
+        for subdir in subdirs:
+            files.extend(_scan_subtree(subdir, skip_dirs, prune, resolve_links))
+        return files
+    
+    with ThreadPoolExecutor(max_workers=min(SCAN_MAX_WORKERS, len(subdirs))) as pool:
+        for subtree_files in pool.map(_scan_subtree, subdirs, itertools.repeat(skip_dirs), itertools.repeat(prune), itertools.repeat(resolve_links)):
+            files.extend(subtree_files)
+    return files
+
+
+def list_folder_files(folder_path: str, recursive: bool = True, prune: bool = False) -> List[str]:
+    """
+    List the regular files under a folder, sorted (zip files are not expanded).
+    
+    Synchronous counterpart of the tree walk in list_files_in_folder, for code that
+    is not running on the event loop. The folder is resolved once, so returned
+    paths are absolute, and symlinked files are listed by their resolved target
+    (a file reached through two links appears twice). As in list_files_in_folder,
+    nothing is pruned by default: logs under hidden directories such as .logs/
+    are analysis inputs too.
+    
+    Args:
+        folder_path: Path to the folder
+        recursive: If True, list files recursively
+        prune: If True, skip hidden and SKIPPED_DIR_NAMES directories and
+            SKIPPED_FILE_NAMES files
+        
+    Returns:
+        Sorted list of absolute file paths
+    """
+    root = os.path.realpath(folder_path)
+    if recursive:
+        files = _scan_tree_parallel(root, prune=prune, resolve_links=True)
+    else:
+        files = _scan_tree(root, False, prune=prune, resolve_links=True)
+    files.sort()
+    return files
+
+
+async def list_files_in_folder(folder_path: str, recursive: bool = True, prune: bool = False, skip_dirs: Optional[FrozenSet[str]] = None, sort: bool = True) -> List[str]:
     """
     List all files in a folder.
     
@@ -257,6 +549,11 @@ async def list_files_in_folder(folder_path: str, recursive: bool = True) -> List
     Args:
         folder_path: Path to the folder
         recursive: If True, list files recursively (and recursively list zip contents)
+        prune: If True, skip hidden directories, those named in skip_dirs and
+            SKIPPED_FILE_NAMES files
+        skip_dirs: Directory names not to descend into when pruning
+            (default: SKIPPED_DIR_NAMES)
+        sort: If True, sort the result; pass False when order does not matter
         
     Returns:
         List of file paths (regular paths and virtual zip paths)
@@ -275,28 +572,41 @@ async def list_files_in_folder(folder_path: str, recursive: bool = True) -> List
         raise NotADirectoryError(f"Path is not a directory: {folder_path}")
     
     logger.debug(f"FileHandler: Listing files in folder: {folder_path} (recursive={recursive})")
+    # Walking the tree and opening zips is blocking I/O; keep it off the event loop
+    if skip_dirs is None:
+        skip_dirs = SKIPPED_DIR_NAMES
+    return await _run_io(_list_files_sync, folder_path, recursive, prune, frozenset(skip_dirs), sort)
+
+
+def _list_files_sync(folder_path: str, recursive: bool, prune: bool, skip_dirs: FrozenSet[str], sort: bool) -> List[str]:
+    """Blocking body of list_files_in_folder (run in a worker thread)."""
     files = []
     zip_files = []
     
     try:
         if recursive:
-            all_paths = list(folder.rglob("*"))
+            paths = _scan_tree_parallel(folder_path, skip_dirs, prune)
         else:
-            all_paths = list(folder.iterdir())
-        
-        for p in all_paths:
-            if p.is_file():
-                file_path_str = str(p)
-                # Check if it's a zip file
-                if is_zip_file(file_path_str):
-                    zip_files.append(file_path_str)
-                else:
-                    files.append(file_path_str)
+            paths = _scan_tree(folder_path, False, skip_dirs, prune)
+        for file_path_str in paths:
+            # Check if it's a zip file
+            if is_zip_file(file_path_str):
+                zip_files.append(file_path_str)
+            else:
+                files.append(file_path_str)
         
-        # List contents of zip files
-        for zip_file in zip_files:
+        # List contents of zip files (concurrently: each one is mostly a central directory read)
+        if len(zip_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(SCAN_MAX_WORKERS, len(zip_files))) as pool:
+                futures = [pool.submit(list_zip_contents, zip_file, recursive) for zip_file in zip_files]
+        else:
+            futures = None
+        for i, zip_file in enumerate(zip_files):
             try:
-                zip_contents = list_zip_contents(zip_file, recursive=recursive)
+                if futures is not None:
+                    zip_contents = futures[i].result()
+                else:
+                    zip_contents = list_zip_contents(zip_file, recursive=recursive)
                 files.extend(zip_contents)
                 logger.debug(f"FileHandler: Found {len(zip_contents)} file(s) inside zip {zip_file}")
             except Exception as e:
@@ -308,7 +618,20 @@ async def list_files_in_folder(folder_path: str, recursive: bool = True) -> List
         logger.error(f"FileHandler: Error listing files in {folder_path}: {e}", exc_info=True)
         raise
     
-    return sorted(files)
+    if sort:
+        # In place, so a large listing is not copied
+        files.sort()
+    return files
+
+
+# Start of an Android logcat line: "01-01 12:00:00.000  1234  1234 I ..."
+_LOGCAT_LINE_RE = re.compile(rb"\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3}\s+\d+\s+\d+\s+[VDIWEF]")
+# Shortest line _LOGCAT_LINE_RE can match ("01-01 12:00:00.000 1 1 I")
+_LOGCAT_MIN_LINE_LEN = 24
+# is_logcat_file only looks at this many leading bytes (enough for 10 typical lines)
+_LOGCAT_SNIFF_SIZE = 8192
+# Extensions of binary/archive files that are never logcat text
+_NON_TEXT_SUFFIXES = frozenset({".zip", ".gz", ".tgz", ".xz", ".bz2", ".7z", ".png", ".jpg", ".jpeg", ".gif", ".bin", ".so", ".apk", ".dex", ".jar"})
 
 
 def is_logcat_file(file_path: str) -> bool:
@@ -323,6 +646,10 @@ def is_logcat_file(file_path: str) -> bool:
     
     Example line: "01-01 12:00:00.000  1234  1234 I Tag: message"
     
+    Only the first _LOGCAT_SNIFF_SIZE bytes are read. Known binary extensions,
+    files too small to hold 3 logcat lines and content with NUL bytes are
+    rejected without running the regex.
+    
     Args:
         file_path: Path to the file
         
@@ -330,29 +657,65 @@ def is_logcat_file(file_path: str) -> bool:
         True if file appears to be logcat format
     """
     try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            # Read first few lines to check format
-            lines = [f.readline() for _ in range(10)]
-            
-            logcat_pattern = re.compile(
-                r"^\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3}\s+\d+\s+\d+\s+[VDIWEF]"
-            )
-            
-            matching_lines = sum(1 for line in lines if logcat_pattern.match(line.strip()))
-            # If at least 3 out of 10 lines match, consider it logcat format
-            return matching_lines >= 3
+        if os.path.splitext(file_path)[1].lower() in _NON_TEXT_SUFFIXES:
+            return False
+        # The header is ASCII, so match raw bytes without decoding
+        with open(file_path, "rb", buffering=0) as f:
+            if os.fstat(f.fileno()).st_size < 3 * _LOGCAT_MIN_LINE_LEN:
+                return False
+            head = f.read(_LOGCAT_SNIFF_SIZE)
+        if b"\x00" in head:
+            # Binary content
+            return False
+        
+        # If at least 3 out of the first 10 lines match, consider it logcat format
+        matching_lines = 0
+        for line in head.split(b"\n", 10)[:10]:
+            line = line.lstrip()
+            # Cheap byte checks reject non-logcat lines before running the regex
+            if len(line) < _LOGCAT_MIN_LINE_LEN or line[2:3] != b"-" or not line[:1].isdigit():
+                continue
+            if _LOGCAT_LINE_RE.match(line):
+                matching_lines += 1
+                if matching_lines >= 3:
+                    return True
+        return False
     except Exception:
         return False
 
 
+def classify_logcat_files(file_paths: List[str]) -> Dict[str, bool]:
+    """
+    Run is_logcat_file over many files concurrently.
+    
+    Each check is dominated by an open and a small read, which release the GIL,
+    so a thread pool overlaps the I/O of many files.
+    
+    Args:
+        file_paths: Paths of the files to classify
+        
+    Returns:
+        Dict mapping each path to whether it appears to be logcat format
+    """
+    if len(file_paths) < 2:
+        return {path: is_logcat_file(path) for path in file_paths}
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(file_paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(file_paths, pool.map(is_logcat_file, file_paths)))
+
+
 # Virtual path separator for files inside zip archives
 ZIP_VIRTUAL_PATH_SEPARATOR = "::"
 
-
 def is_zip_file(file_path: str) -> bool:
     """
     Check if a file is a zip archive.
     
+    Only looks for the end-of-central-directory record that ZipFile itself needs
+    to open the archive, searched from the end of the file the way ZipFile does.
+    Archives with data prepended (e.g. self-extracting stubs) are accepted.
+    Entries are not decompressed.
+    
     Args:
         file_path: Path to the file
         
@@ -360,20 +723,12 @@ def is_zip_file(file_path: str) -> bool:
         True if file is a zip archive
     """
     try:
-        path = Path(file_path)
-        if not path.is_file():
-            return False
         # Check extension
-        if path.suffix.lower() == '.zip':
-            # Also verify it's actually a zip file by trying to open it
-            try:
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    # Just check if we can read the zip file list
-                    zip_ref.testzip()
-                    return True
-            except (zipfile.BadZipFile, IOError, OSError):
-                return False
-        return False
+        if os.path.splitext(file_path)[1].lower() != '.zip':
+            return False
+        if not stat.S_ISREG(os.stat(file_path).st_mode):
+            return False
+        return zipfile.is_zipfile(file_path)
     except Exception:
         return False
 
@@ -390,14 +745,11 @@ def parse_zip_path(virtual_path: str) -> Optional[Tuple[str, str]]:
     Returns:
         Tuple of (zip_path, internal_path) if valid, None otherwise
     """
+    # Plain paths (the common case) are rejected without allocating anything
     if ZIP_VIRTUAL_PATH_SEPARATOR not in virtual_path:
         return None
     
-    parts = virtual_path.split(ZIP_VIRTUAL_PATH_SEPARATOR, 1)
-    if len(parts) != 2:
-        return None
-    
-    zip_path, internal_path = parts
+    zip_path, _, internal_path = virtual_path.partition(ZIP_VIRTUAL_PATH_SEPARATOR)
     if not zip_path or not internal_path:
         return None
     
@@ -419,14 +771,12 @@ def sanitize_zip_path(internal_path: str) -> str:
     Returns:
         Sanitized path
     """
-    # Remove leading slashes
-    path = internal_path.lstrip('/').lstrip('\\')
-    
-    # Normalize path separators (convert backslashes to forward slashes)
-    path = path.replace('\\', '/')
+    # Normalize path separators (convert backslashes to forward slashes), then remove leading slashes
+    path = internal_path.replace('\\', '/').lstrip('/')
     
     # Remove path traversal sequences and normalize dots
-    if '..' in path or '/./' in path or path.startswith('./') or path.endswith('/.'):
+    # (a '.' or '..' component always starts the path or follows a '/')
+    if path.startswith('.') or '/.' in path:
         # Split and filter out '..' and '.' components
         parts = []
         for part in path.split('/'):
@@ -493,6 +843,239 @@ def validate_zip_file_security(
     return (True, None)
 
 
+# Open archives kept around so repeated member reads skip the central directory parse
+_OPEN_ZIP_CACHE_SIZE = 8
+# An archive unused for this long is closed, so files aren't held open (locked, on Windows)
+_OPEN_ZIP_IDLE_SECONDS = 5.0
+
+
+class _CachedZip:
+    """An open ZipFile lent to one reader at a time."""
+    
+    __slots__ = ("signature", "zip_ref", "in_use", "last_used")
+    
+    def __init__(self, signature: Tuple[int, int], zip_ref: zipfile.ZipFile):
+        self.signature = signature
+        self.zip_ref = zip_ref
+        self.in_use = True
+        self.last_used = 0.0
+
+
+_open_zips: "OrderedDict[str, _CachedZip]" = OrderedDict()
+_open_zips_lock = threading.Lock()
+_idle_timer: Optional[threading.Timer] = None
+
+
+@contextmanager
+def _open_zip(zip_path: str) -> Iterator[zipfile.ZipFile]:
+    """
+    Open a zip archive for reading, reusing a cached ZipFile when possible.
+    
+    A cached ZipFile is used by one reader at a time; a reader that finds it
+    busy opens a private one instead, so ZipFile objects are never shared
+    across threads. Entries are keyed by path and validated against
+    (size, mtime_ns), so a rewritten archive is reopened. Up to
+    _OPEN_ZIP_CACHE_SIZE archives stay open, each for at most
+    _OPEN_ZIP_IDLE_SECONDS after its last use.
+    
+    Args:
+        zip_path: Path to the zip file
+        
+    Yields:
+        Open ZipFile (do not close it)
+    """
+    st = os.stat(zip_path)
+    signature = (st.st_size, st.st_mtime_ns)
+    entry = None
+    stale = None
+    with _open_zips_lock:
+        cached = _open_zips.get(zip_path)
+        if cached is not None and cached.signature != signature:
+            del _open_zips[zip_path]
+            if not cached.in_use:
+                stale = cached
+            cached = None
+        if cached is not None and not cached.in_use:
+            cached.in_use = True
+            _open_zips.move_to_end(zip_path)
+            entry = cached
+    if stale is not None:
+        stale.zip_ref.close()
+    
+    if entry is None:
+        entry = _CachedZip(signature, zipfile.ZipFile(zip_path, 'r'))
+        if cached is None:
+            evicted = []
+            with _open_zips_lock:
+                if zip_path not in _open_zips:
+                    _open_zips[zip_path] = entry
+                    while len(_open_zips) > _OPEN_ZIP_CACHE_SIZE:
+                        oldest = _open_zips.popitem(last=False)[1]
+                        # A busy entry is closed by its reader on release
+                        if not oldest.in_use:
+                            evicted.append(oldest)
+            for oldest in evicted:
+                oldest.zip_ref.close()
+    
+    try:
+        yield entry.zip_ref
+    finally:
+        with _open_zips_lock:
+            entry.in_use = False
+            entry.last_used = time.monotonic()
+            still_cached = _open_zips.get(zip_path) is entry
+            if still_cached:
+                _schedule_idle_close()
+        if not still_cached:
+            entry.zip_ref.close()
+
+
+def _schedule_idle_close(delay: Optional[float] = None) -> None:
+    """Start the idle-close timer if it isn't running (call with _open_zips_lock held)."""
+    global _idle_timer
+    if _idle_timer is None:
+        _idle_timer = threading.Timer(_OPEN_ZIP_IDLE_SECONDS if delay is None else delay, _close_idle_zips)
+        _idle_timer.daemon = True
+        _idle_timer.start()
+
+
+def _close_idle_zips() -> None:
+    """Close cached archives idle for _OPEN_ZIP_IDLE_SECONDS; re-arm while any stay open."""
+    global _idle_timer
+    idle = []
+    with _open_zips_lock:
+        _idle_timer = None
+        now = time.monotonic()
+        next_due = None
+        for path, entry in list(_open_zips.items()):
+            if entry.in_use:
+                continue
+            due = entry.last_used + _OPEN_ZIP_IDLE_SECONDS
+            if due <= now:
+                del _open_zips[path]
+                idle.append(entry)
+            elif next_due is None or due < next_due:
+                next_due = due
+        if next_due is not None:
+            _schedule_idle_close(next_due - now)
+    for entry in idle:
+        entry.zip_ref.close()
+
+
+def close_open_zips() -> None:
+    """Close all cached archives (e.g. on shutdown); busy ones close when their reader finishes."""
+    global _idle_timer
+    with _open_zips_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
+        idle = [entry for entry in _open_zips.values() if not entry.in_use]
+        _open_zips.clear()
+    for entry in idle:
+        entry.zip_ref.close()
+
+
+# Case-insensitive member name indexes of recently used archives
+_ZIP_NAME_INDEX_CACHE_SIZE = 32
+_zip_name_indexes: "OrderedDict[Tuple[str, int, int], Dict[str, str]]" = OrderedDict()
+_zip_name_indexes_lock = threading.Lock()
+
+
+def _zip_name_index(zip_ref: zipfile.ZipFile, zip_path: str) -> Dict[str, str]:
+    """
+    Map each member's sanitized, lowercased path to its name in the archive.
+    
+    Cached by (zip_path, size, mtime_ns), so a rewritten archive is re-indexed.
+    When several members collide case-insensitively, the first one wins.
+    """
+    try:
+        st = os.stat(zip_path)
+        key = (zip_path, st.st_size, st.st_mtime_ns)
+    except OSError:
+        key = None
+    
+    if key is not None:
+        with _zip_name_indexes_lock:
+            index = _zip_name_indexes.get(key)
+            if index is not None:
+                _zip_name_indexes.move_to_end(key)
+                return index
+    
+    index = {}
+    for name in zip_ref.namelist():
+        index.setdefault(sanitize_zip_path(name).lower(), name)
+    
+    if key is not None:
+        with _zip_name_indexes_lock:
+            _zip_name_indexes[key] = index
+            if len(_zip_name_indexes) > _ZIP_NAME_INDEX_CACHE_SIZE:
+                _zip_name_indexes.popitem(last=False)
+    return index
+
+
+def _find_zip_member(zip_ref: zipfile.ZipFile, zip_path: str, sanitized_path: str) -> Optional[zipfile.ZipInfo]:
+    """
+    Look up a member by sanitized path, falling back to a case-insensitive match.
+    
+    Args:
+        zip_ref: Open archive
+        zip_path: Path to the zip file (cache key for the case-insensitive index)
+        sanitized_path: Sanitized internal path
+        
+    Returns:
+        ZipInfo of the member, or None if not found
+    """
+    try:
+        return zip_ref.getinfo(sanitized_path)
+    except KeyError:
+        pass
+    name = _zip_name_index(zip_ref, zip_path).get(sanitized_path.lower())
+    return zip_ref.getinfo(name) if name is not None else None
+
+
+def _use_mmap_for(zip_info: zipfile.ZipInfo) -> bool:
+    """Whether a member is a large, unencrypted ZIP_STORED entry readable via mmap."""
+    return (
+        zip_info.compress_type == zipfile.ZIP_STORED
+        and not zip_info.flag_bits & 0x1
+        and zip_info.file_size >= max(1, MMAP_STORED_MIN_SIZE)
+    )
+
+
+@contextmanager
+def _mmap_stored_entry(zip_path: str, zip_info: zipfile.ZipInfo) -> Iterator[mmap.mmap]:
+    """
+    Map the data of a ZIP_STORED member straight from the archive.
+    
+    Stored data is a contiguous byte range, so mapping it skips ZipExtFile's
+    buffering and CRC check. The map ends exactly at the member's last byte.
+    
+    Args:
+        zip_path: Path to the zip file
+        zip_info: ZipInfo of an uncompressed, unencrypted member
+        
+    Yields:
+        mmap positioned at the first data byte
+    """
+    with open(zip_path, "rb") as f:
+        f.seek(zip_info.header_offset)
+        header = f.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local file header for {zip_info.filename} in {zip_path}")
+        # File name and extra field lengths are the last two fields of the local header
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        data_offset = zip_info.header_offset + zipfile.sizeFileHeader + name_len + extra_len
+        # mmap offsets must be a multiple of the allocation granularity
+        map_offset = data_offset - data_offset % mmap.ALLOCATIONGRANULARITY
+        skip = data_offset - map_offset
+        mm = mmap.mmap(f.fileno(), skip + zip_info.file_size, offset=map_offset, access=mmap.ACCESS_READ)
+    try:
+        mm.seek(skip)
+        yield mm
+    finally:
+        mm.close()
+
+
 def list_zip_contents(zip_path: str, recursive: bool = True, recursion_depth: int = 0) -> List[str]:
     """
     List all file paths inside a zip archive.
@@ -513,7 +1096,7 @@ def list_zip_contents(zip_path: str, recursive: bool = True, recursion_depth: in
     file_count = 0
     
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with _open_zip(zip_path) as zip_ref:
             for zip_info in zip_ref.infolist():
                 # Skip directories
                 if zip_info.is_dir():
@@ -585,42 +1168,37 @@ def read_file_from_zip(zip_path: str, internal_path: str, cancellation_event: Op
         CancelledError: If operation is cancelled
     """
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with _open_zip(zip_path) as zip_ref:
             # Sanitize internal path
             sanitized_path = sanitize_zip_path(internal_path)
             
             # Try to find the file (case-insensitive if needed)
-            try:
-                zip_info = zip_ref.getinfo(sanitized_path)
-            except KeyError:
-                # Try case-insensitive search
-                found = False
-                for name in zip_ref.namelist():
-                    if sanitize_zip_path(name).lower() == sanitized_path.lower():
-                        sanitized_path = name
-                        zip_info = zip_ref.getinfo(name)
-                        found = True
-                        break
-                if not found:
-                    raise FileNotFoundError(f"File {internal_path} not found in {zip_path}")
+            zip_info = _find_zip_member(zip_ref, zip_path, sanitized_path)
+            if zip_info is None:
+                raise FileNotFoundError(f"File {internal_path} not found in {zip_path}")
+            sanitized_path = zip_info.filename
             
             # Validate security constraints
             is_valid, error_msg = validate_zip_file_security(zip_path, zip_info, 0, 0, 0)
             if not is_valid:
                 raise ValueError(f"Security validation failed: {error_msg}")
             
-            # Read file line by line
-            with zip_ref.open(sanitized_path, 'r') as file_in_zip:
+            # Read file line by line (large stored members straight from a memory map)
+            if _use_mmap_for(zip_info):
+                opener = _mmap_stored_entry(zip_path, zip_info)
+            else:
+                opener = zip_ref.open(sanitized_path, 'r')
+            with opener as file_in_zip:
+                is_cancelled = cancellation_event.is_set if cancellation_event else None
                 count = 0
-                for line_bytes in file_in_zip:
-                    # Check for cancellation
-                    if cancellation_event and cancellation_event.is_set():
+                for line_bytes in iter(file_in_zip.readline, b""):
+                    # Check for cancellation every 1024 lines, as read_file_lines does
+                    if is_cancelled is not None and (count & 1023) == 0 and is_cancelled():
                         logger.info(f"FileHandler: Reading from zip {zip_path}::{internal_path} cancelled at line {count}")
                         raise CancelledError(f"File reading cancelled: {zip_path}::{internal_path}")
                     
                     # Decode bytes to string
-                    line = line_bytes.decode('utf-8', errors='ignore')
-                    yield line
+                    yield line_bytes.decode('utf-8', errors='ignore')
                     count += 1
                     
     except CancelledError:
@@ -645,25 +1223,16 @@ def extract_file_from_zip(zip_path: str, internal_path: str, extract_to: Path) -
         Path to extracted file, or None if extraction failed
     """
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with _open_zip(zip_path) as zip_ref:
             # Sanitize internal path
             sanitized_path = sanitize_zip_path(internal_path)
             
-            # Try to find the file
-            try:
-                zip_info = zip_ref.getinfo(sanitized_path)
-            except KeyError:
-                # Try case-insensitive search
-                found = False
-                for name in zip_ref.namelist():
-                    if sanitize_zip_path(name).lower() == sanitized_path.lower():
-                        sanitized_path = name
-                        zip_info = zip_ref.getinfo(name)
-                        found = True
-                        break
-                if not found:
-                    logger.error(f"FileHandler: File {internal_path} not found in {zip_path}")
-                    return None
+            # Try to find the file (case-insensitive if needed)
+            zip_info = _find_zip_member(zip_ref, zip_path, sanitized_path)
+            if zip_info is None:
+                logger.error(f"FileHandler: File {internal_path} not found in {zip_path}")
+                return None
+            sanitized_path = zip_info.filename
             
             # Validate security constraints
             is_valid, error_msg = validate_zip_file_security(zip_path, zip_info, 0, 0, 0)
@@ -676,17 +1245,24 @@ def extract_file_from_zip(zip_path: str, internal_path: str, extract_to: Path) -
             
             # Generate unique filename to avoid conflicts
             # Use hash of full path or UUID
-            import hashlib
-            path_hash = hashlib.md5(f"{zip_path}{ZIP_VIRTUAL_PATH_SEPARATOR}{sanitized_path}".encode()).hexdigest()[:8]
-            file_stem = Path(sanitized_path).stem
-            file_suffix = Path(sanitized_path).suffix
+            path_hash = hashlib.blake2b(f"{zip_path}{ZIP_VIRTUAL_PATH_SEPARATOR}{sanitized_path}".encode(), digest_size=4).hexdigest()
+            # Member names always use '/' separators
+            file_stem, file_suffix = os.path.splitext(sanitized_path.rpartition('/')[2])
             extracted_filename = f"{file_stem}_{path_hash}{file_suffix}"
             extracted_path = extract_to / extracted_filename
             
             # Extract directly to file using streaming
-            with zip_ref.open(sanitized_path, 'r') as file_in_zip:
-                with open(extracted_path, 'wb') as out_file:
-                    shutil.copyfileobj(file_in_zip, out_file)
+            size = zip_info.file_size
+            with open(extracted_path, 'wb') as out_file:
+                if size > 0:
+                    if hasattr(os, "posix_fallocate"):
+                        try:
+                            # Reserve the space up front instead of extending on every write
+                            os.posix_fallocate(out_file.fileno(), 0, size)
+                        except OSError:
+                            pass
+                    with zip_ref.open(sanitized_path, 'r') as file_in_zip:
+                        shutil.copyfileobj(file_in_zip, out_file, min(size, EXTRACT_BUFFER_SIZE))
             
             logger.debug(f"FileHandler: Extracted {internal_path} from {zip_path} to {extracted_path}")
             return extracted_path
@@ -713,30 +1289,40 @@ def validate_file_path(file_path: str) -> bool:
         True if path is valid and accessible
     """
     try:
-        # Check if it's a virtual zip path
+        # For a virtual zip path, validate the zip file itself
+        # (internal path validation is handled during extraction/reading)
         zip_path_info = parse_zip_path(file_path)
-        if zip_path_info:
-            zip_path, internal_path = zip_path_info
-            # Validate the zip file exists and is readable
-            if not validate_file_path(zip_path):  # Recursive call for zip file
-                return False
-            # Validate it's actually a zip file
-            if not is_zip_file(zip_path):
-                return False
-            # Internal path validation is handled during extraction/reading
-            return True
+        path = zip_path_info[0] if zip_path_info else file_path
         
-        # Regular file path validation
-        path = Path(file_path).resolve()
-        # Check if path exists
-        if not path.exists():
+        # One stat tells existence and type
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
             return False
-        # Check if readable (file or directory)
-        if path.is_file():
-            return os.access(path, os.R_OK)
-        elif path.is_dir():
-            return os.access(path, os.R_OK)
-        return False
+        
+        # Check if readable (file or directory). Not cached: access also depends on
+        # parent directories and the process's credentials, which stat doesn't cover
+        if not (stat.S_ISREG(st.st_mode) or stat.S_ISDIR(st.st_mode)):
+            return False
+        if not os.access(path, os.R_OK):
+            return False
+        
+        # Validate it's actually a zip file
+        if zip_path_info:
+            return _is_zip_file_cached(path, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        return True
     except Exception:
         return False
 
+
+@functools.lru_cache(maxsize=4096)
+def _is_zip_file_cached(path: str, size: int, mtime_ns: int, ctime_ns: int) -> bool:
+    """
+    is_zip_file for an already stat'ed path.
+    
+    The stat fields are part of the key, so a modified or replaced archive is
+    checked again. Reads of many members of the same zip then open the archive
+    to check it only once.
+    """
+    return is_zip_file(path)
+
@@ -57,6 +57,14 @@ def load_config_from_file(file_path: str) -> tuple[dict, Optional[callable]]:
     return insight_config, process_results_fn
 
 
+async def _run_all(insight: ConfigBasedInsight, paths: List[str], verbose: bool) -> List[InsightResult]:
+    # Sequential, so progress output stays grouped per path
+    results = []
+    for path in paths:
+        results.append(await run_insight_with_ai_standalone(insight, path, verbose=verbose))
+    return results
+
+
 def main_config_standalone(
     file_path: str,
     input_file_paths: Optional[List[str]] = None,
@@ -132,11 +140,8 @@ def main_config_standalone(
                     print("No file paths provided. Exiting.", file=sys.stderr)
                     sys.exit(1)
         
-        # Run the insight for each path separately
-        all_results = []
-        for path in input_file_paths:
-            result = asyncio.run(run_insight_with_ai_standalone(insight, path, verbose=verbose))
-            all_results.append(result)
+        # Run the insight for each path separately, all inside one event loop
+        all_results = asyncio.run(_run_all(insight, input_file_paths, verbose))
         
         # Print results for each path
         for idx, result in enumerate(all_results, 1):
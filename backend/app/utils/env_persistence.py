@@ -12,15 +12,17 @@ def get_env_file_path() -> Path:
 
 def read_env_file(env_file: Path) -> Dict[str, str]:
     env_vars = {}
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
+    try:
+        text = env_file.read_text()
+    except FileNotFoundError:
+        return env_vars
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        key, sep, value = line.partition('=')
+        if sep:
+            env_vars[key.strip()] = value.strip()
     return env_vars
 
 
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import sys
 import os
+import re
 from pathlib import Path
 from typing import List
 from app.core.insight_base import Insight
@@ -9,6 +10,9 @@ from app.core.models import InsightResult
 
 logger = logging.getLogger(__name__)
 
+# Progress messages shown even without --verbose
+_PROGRESS_KEYWORDS = re.compile(r"complete|error|cancelled|starting", re.IGNORECASE)
+
 
 def check_venv_and_reexecute():
     """
@@ -45,7 +49,7 @@ def print_progress(message: str, verbose: bool = False):
         print(f"[PROGRESS] {message}", file=sys.stderr)
     else:
         # Only print important progress updates
-        if any(keyword in message.lower() for keyword in ["complete", "error", "cancelled", "starting"]):
+        if _PROGRESS_KEYWORDS.search(message):
             print(f"[PROGRESS] {message}", file=sys.stderr)
 
 
@@ -0,0 +1,489 @@
+"""Tests for ai_service.py"""
+
+import asyncio
+import dataclasses
+import json
+import httpx
+import pytest
+
+from app.core import config as config_module
+from app.core.config import AIConfig, AIConfigSnapshot
+from app.services import ai_service
+from app.services.ai_service import AIService, get_ai_service
+
+
+class FakeStreamResponse:
+    """Minimal stand-in for an httpx streaming response."""
+
+    def __init__(self, lines, status_code=200, chunks=None):
+        self._lines = lines
+        self._chunks = chunks
+        self.status_code = status_code
+        self.headers = {}
+
+    async def aiter_bytes(self):
+        if self._chunks is not None:
+            for chunk in self._chunks:
+                yield chunk
+            return
+        for line in self._lines:
+            yield line.encode() + b"\n"
+
+    async def aread(self):
+        return "\n".join(self._lines).encode()
+
+
+def sse(payload) -> str:
+    return "data: " + json.dumps(payload)
+
+
+async def collect(service, response):
+    return [chunk async for chunk in service._handle_streaming_response(response, "http://ai", "http://ai/v1/chat/completions")]
+
+
+class TestStreamingResponse:
+    """Tests for AIService._handle_streaming_response()."""
+
+    async def test_yields_delta_content(self):
+        """Test that delta content is extracted from each SSE frame."""
+        response = FakeStreamResponse([
+            sse({"choices": [{"delta": {"role": "assistant", "content": "Hello"}}]}),
+            "",
+            sse({"choices": [{"delta": {"content": ", \"world\"\n}"}}]}),
+            sse({"choices": [{"delta": {}, "finish_reason": "stop"}]}),
+            "data: [DONE]",
+        ])
+        chunks = await collect(AIService(), response)
+        assert chunks == ["Hello", ", \"world\"\n}"]
+
+    async def test_unicode_escapes_are_decoded(self):
+        """Test that escaped unicode in content is decoded."""
+        response = FakeStreamResponse([
+            sse({"choices": [{"delta": {"content": "로그 ✓"}}]}),
+            "data: [DONE]",
+        ])
+        assert await collect(AIService(), response) == ["로그 ✓"]
+
+    async def test_frames_split_across_chunks(self):
+        """Test that frames and multi-byte characters split across network chunks are reassembled."""
+        body = 'data: {"choices": [{"delta": {"content": "로그"}}]}\r\n\r\ndata: [DONE]'.encode()
+        split = body.index("로".encode()) + 1
+        response = FakeStreamResponse([], chunks=[body[:5], body[5:split], body[split:]])
+        assert await collect(AIService(), response) == ["로그"]
+
+    async def test_lone_cr_and_split_crlf_end_lines(self):
+        """Test that a lone CR ends a line and a CRLF split across chunks yields no empty extra line."""
+        response = FakeStreamResponse([], chunks=[b"a\rb\r", b"\nc\n\nd"])
+        assert [line async for line in ai_service._iter_sse_lines(response)] == [b"a", b"b", b"c", b"", b"d"]
+
+    async def test_frame_spread_over_many_chunks(self):
+        """Test that a long frame arriving in small pieces is reassembled."""
+        frame = sse({"choices": [{"delta": {"content": "x" * 5000}}]}).encode()
+        chunks = [frame[i:i + 7] for i in range(0, len(frame), 7)] + [b"\n\ndata: [DONE]\n"]
+        response = FakeStreamResponse([], chunks=chunks)
+        assert await collect(AIService(), response) == ["x" * 5000]
+
+    async def test_error_frame_raises(self):
+        """Test that an error frame in the stream raises."""
+        response = FakeStreamResponse([
+            sse({"error": {"message": "Invalid model"}}),
+        ])
+        with pytest.raises(Exception, match="Invalid model"):
+            await collect(AIService(), response)
+
+    async def test_message_error_frame_raises(self):
+        """Test that a top-level error-like message without choices raises."""
+        response = FakeStreamResponse([sse({"message": "Model not found"})])
+        with pytest.raises(Exception, match="Model not found"):
+            await collect(AIService(), response)
+
+    async def test_delta_with_message_field_is_not_an_error(self):
+        """Test that a normal frame carrying choices is not treated as an error because of a message field."""
+        response = FakeStreamResponse([
+            sse({"message": "invalid usage stats", "choices": [{"delta": {"content": "ok"}}]}),
+            "data: [DONE]",
+        ])
+        assert await collect(AIService(), response) == ["ok"]
+
+    async def test_plain_text_error_raises(self):
+        """Test that a plain-text error body is surfaced."""
+        response = FakeStreamResponse(["Error: upstream failed"])
+        with pytest.raises(Exception, match="upstream failed"):
+            await collect(AIService(), response)
+
+    async def test_non_json_error_frame_raises(self):
+        """Test that a non-JSON data frame containing an error keyword is surfaced (case-insensitive)."""
+        response = FakeStreamResponse([
+            sse({"choices": [{"delta": {"content": "partial"}}]}),
+            "data: Upstream FAILED to respond",
+        ])
+        with pytest.raises(Exception, match="Upstream FAILED"):
+            await collect(AIService(), response)
+
+    async def test_non_json_frame_without_keywords_is_skipped(self):
+        """Test that an unparseable frame without error keywords is ignored."""
+        response = FakeStreamResponse([
+            "data: {partial",
+            sse({"choices": [{"delta": {"content": "ok"}}]}),
+            "data: [DONE]",
+        ])
+        assert await collect(AIService(), response) == ["ok"]
+
+
+@pytest.fixture
+def set_ai_config():
+    """
+    Assign AIConfig fields and bump its version.
+    
+    On teardown the fields are restored and the version bumped again, so no later
+    test sees a snapshot or pooled service built from this test's settings.
+    """
+    patcher = pytest.MonkeyPatch()
+
+    def _set(**fields):
+        for name, value in fields.items():
+            patcher.setattr(AIConfig, name, value)
+        AIConfig.mark_changed()
+
+    yield _set
+    patcher.undo()
+    AIConfig.mark_changed()
+    ai_service.reset_ai_service()
+
+
+@pytest.fixture
+def mock_ai_server(set_ai_config, monkeypatch):
+    """Route AIService HTTP calls to an in-process handler and record requests."""
+    requests = []
+
+    def _install(handler):
+        def _record(request):
+            requests.append(request)
+            return handler(request)
+        transport = httpx.MockTransport(_record)
+        real_client = httpx.AsyncClient
+        monkeypatch.setattr(ai_service.httpx, "AsyncClient", lambda **kwargs: real_client(transport=transport, **kwargs))
+        monkeypatch.setattr(AIConfig, "is_configured", classmethod(lambda cls: True))
+        monkeypatch.setattr(ai_service.AppConfig, "get_ai_processing_enabled", classmethod(lambda cls: True))
+        monkeypatch.setattr(ai_service, "_models_cache", {})
+        monkeypatch.setattr(ai_service, "_registry", ai_service._AIServiceRegistry())
+        set_ai_config(BASE_URL="http://ai.test", API_KEY="sk-test-key-123456")
+        return requests
+    return _install
+
+
+class TestGetAvailableModels:
+    """Tests for AIService.get_available_models()."""
+
+    async def test_models_are_cached(self, mock_ai_server):
+        """Test that a second call within the TTL does not hit the server."""
+        requests = mock_ai_server(lambda request: httpx.Response(200, json={"data": [{"id": "m1"}, {"id": "m2"}]}))
+        service = AIService()
+        assert await service.get_available_models() == ["m1", "m2"]
+        assert await service.get_available_models() == ["m1", "m2"]
+        assert len(requests) == 1
+
+    async def test_cache_keyed_by_base_url(self, mock_ai_server, set_ai_config):
+        """Test that changing the base URL bypasses the cached list."""
+        requests = mock_ai_server(lambda request: httpx.Response(200, json={"data": [{"id": request.url.host}]}))
+        assert await get_ai_service().get_available_models() == ["ai.test"]
+        set_ai_config(BASE_URL="http://other.test")
+        assert await get_ai_service().get_available_models() == ["other.test"]
+        assert len(requests) == 2
+
+    async def test_failures_are_not_cached(self, mock_ai_server):
+        """Test that an error response is retried on the next call."""
+        requests = mock_ai_server(lambda request: httpx.Response(500, text="boom"))
+        service = AIService()
+        assert await service.get_available_models() == []
+        assert await service.get_available_models() == []
+        assert len(requests) == 2
+
+
+class TestAnalyzeMany:
+    """Tests for AIService.analyze_many()."""
+
+    async def test_limits_concurrency_and_keeps_order(self, mock_ai_server, set_ai_config):
+        """Test that at most AI_MAX_CONCURRENT_REQUESTS run at once and results keep input order."""
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            content = json.loads(request.content)["messages"][1]["content"]
+            return httpx.Response(200, json={"choices": [{"message": {"content": content[-1]}}]})
+
+        mock_ai_server(handler)
+        set_ai_config(STREAMING_ENABLED=False)
+        items = [(f"log {i}", "summarize") for i in range(10)]
+        results = await get_ai_service().analyze_many(items)
+        assert results == [str(i) for i in range(10)]
+        assert peak == ai_service.AI_MAX_CONCURRENT_REQUESTS
+
+
+class TestBuildPrompt:
+    """Tests for AIService.build_prompt()."""
+
+    def test_substitutes_variables_and_content(self):
+        """Test that variables and {result_content} are substituted, unknown placeholders kept."""
+        prompt = AIService().build_prompt(
+            "LOGS", "custom", "Device {device} on {build}: {result_content} {unknown}", {"device": "pixel", "build": 42}
+        )
+        assert prompt == "Device pixel on 42: LOGS {unknown}"
+
+    def test_appends_content_without_placeholder(self):
+        """Test that content is appended when the template has no {result_content}."""
+        assert AIService().build_prompt("LOGS", "custom", "Check {x}", {"x": "y"}) == "Check y\n\nLOGS"
+
+    def test_values_are_not_rescanned(self):
+        """Test that placeholders inside substituted values are left untouched."""
+        prompt = AIService().build_prompt("LOGS", "custom", "{a} {result_content}", {"a": "{result_content}"})
+        assert prompt == "{result_content} LOGS"
+
+
+class TestApiUrl:
+    """Tests for _api_url()."""
+
+    @pytest.mark.parametrize("base_url", ["http://ai.test", "http://ai.test/", "http://ai.test/v1", "http://ai.test/v1/"])
+    def test_appends_v1_once(self, base_url):
+        """Test that /v1 is added only when missing and trailing slashes are dropped."""
+        assert ai_service._api_url(base_url, "models") == "http://ai.test/v1/models"
+
+
+class TestTestConnection:
+    """Tests for AIService.test_connection()."""
+
+    async def test_success(self, mock_ai_server):
+        """Test that a valid completion response reports success."""
+        requests = mock_ai_server(lambda request: httpx.Response(200, json={"choices": [{"message": {"content": "OK"}}]}))
+        ok, message = await get_ai_service().test_connection()
+        assert ok and "Connection successful" in message
+        assert requests[0].headers["Authorization"] == "Bearer sk-test-key-123456"
+        assert requests[0].headers["Content-Type"] == "application/json"
+
+    async def test_404_suggests_v1(self, mock_ai_server):
+        """Test that a 404 body mentioning 'not found' yields the /v1 hint."""
+        mock_ai_server(lambda request: httpx.Response(404, text="Not Found"))
+        ok, message = await get_ai_service().test_connection()
+        assert not ok and "Try: http://ai.test/v1" in message
+
+    async def test_error_body_is_reported(self, mock_ai_server):
+        """Test that an HTTP error body is decoded into the message."""
+        mock_ai_server(lambda request: httpx.Response(401, text="bad key ✗"))
+        ok, message = await get_ai_service().test_connection()
+        assert not ok and message == "Connection failed (401): bad key ✗"
+
+    async def test_connection_error_cites_request_url(self, mock_ai_server, set_ai_config):
+        """Test that a transport error reports the base URL the request was sent to, even after a config change."""
+        def handler(request):
+            set_ai_config(BASE_URL="http://other.test")
+            raise httpx.ConnectError("refused", request=request)
+
+        mock_ai_server(handler)
+        ok, message = await get_ai_service().test_connection()
+        assert not ok and message == "Connection error (http://ai.test): refused"
+
+
+class TestMaskSensitiveHeaders:
+    """Tests for AIService._mask_sensitive_headers()."""
+
+    def test_masks_bearer_key_without_mutating_headers(self):
+        """Test that the API key is masked and the original headers are untouched."""
+        headers = {"Authorization": "Bearer sk-abcdefghijklmnop", "Content-Type": "application/json"}
+        masked = AIService()._mask_sensitive_headers(headers)
+        assert dict(masked) == {"Authorization": "Bearer sk-abcde...mnop", "Content-Type": "application/json"}
+        assert headers["Authorization"] == "Bearer sk-abcdefghijklmnop"
+
+    def test_short_key_fully_masked(self):
+        """Test that short keys are not partially revealed."""
+        masked = AIService()._mask_sensitive_headers({"Authorization": "Bearer abc"})
+        assert masked["Authorization"] == "Bearer ***"
+
+
+class TestDetailedLogging:
+    """Tests for AIService._log_detailed_request()."""
+
+    def test_payload_logged_unescaped_and_truncated(self, monkeypatch, caplog):
+        """Test that the payload log keeps non-ASCII text and truncates long messages."""
+        monkeypatch.setattr(AIConfig, "DETAILED_LOGGING", True)
+        payload = {"messages": [{"role": "user", "content": "로그" + "x" * 600}]}
+        service = AIService(dataclasses.replace(AIConfig.snapshot(), api_key="sk-abcdefghijklmnop"))
+        with caplog.at_level("INFO", logger=ai_service.logger.name):
+            service._log_detailed_request("POST", "http://ai", payload)
+        text = caplog.text
+        assert "로그" in text and "truncated, total length: 602 chars" in text
+        assert "sk-abcdefghijklmnop" not in text
+        assert len(payload["messages"][0]["content"]) == 602
+
+    @pytest.mark.parametrize("detailed, level", [(False, "INFO"), (True, "WARNING")])
+    def test_headers_not_masked_unless_logged(self, monkeypatch, caplog, detailed, level):
+        """Test that header masking is skipped when detailed logging is off or INFO is filtered."""
+        monkeypatch.setattr(AIConfig, "DETAILED_LOGGING", detailed)
+
+        def fail(self, headers):
+            raise AssertionError("headers masked although nothing is logged")
+
+        monkeypatch.setattr(AIService, "_mask_sensitive_headers", fail)
+        with caplog.at_level(level, logger=ai_service.logger.name):
+            AIService()._log_detailed_request("POST", "http://ai", {"messages": []})
+
+    def test_skipped_when_disabled(self, monkeypatch, caplog):
+        """Test that nothing is logged when detailed logging is off."""
+        monkeypatch.setattr(AIConfig, "DETAILED_LOGGING", False)
+        with caplog.at_level("INFO", logger=ai_service.logger.name):
+            AIService()._log_detailed_request("POST", "http://ai", {"messages": []})
+        assert caplog.text == ""
+
+
+class TestGetAiService:
+    """Tests for get_ai_service()."""
+
+    def test_reuses_instance_while_config_unchanged(self, mock_ai_server):
+        """Test that the singleton is reused when AIConfig has not changed."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        assert get_ai_service() is get_ai_service()
+
+    def test_rebuilds_on_connection_change(self, mock_ai_server, set_ai_config):
+        """Test that a changed connection setting yields a new service."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        first = get_ai_service()
+        set_ai_config(BASE_URL="http://other.test")
+        second = get_ai_service()
+        assert second is not first
+        assert second.base_url == "http://other.test"
+
+    def test_call_settings_applied_in_place(self, mock_ai_server, set_ai_config):
+        """Test that model/temperature changes reuse the service and its client."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        first = get_ai_service()
+        set_ai_config(MODEL="other-model", TEMPERATURE=0.1)
+        assert get_ai_service() is first
+        assert (first.model, first.temperature) == ("other-model", 0.1)
+
+    def test_reload_without_changes_keeps_instance(self, mock_ai_server):
+        """Test that a version bump with identical fields reuses the instance."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        first = get_ai_service()
+        snapshot = AIConfig.snapshot()
+        AIConfig.mark_changed()
+        assert AIConfig.snapshot() is snapshot
+        assert get_ai_service() is first
+
+    def test_change_while_building_is_picked_up(self, mock_ai_server, set_ai_config, monkeypatch):
+        """Test that a config change landing while a snapshot is built is not stamped as current."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        real_snapshot = config_module.AIConfigSnapshot
+        calls = []
+
+        def racing_snapshot(**fields):
+            if not calls:
+                set_ai_config(BASE_URL="http://other.test")
+            calls.append(fields)
+            return real_snapshot(**fields)
+
+        monkeypatch.setattr(config_module, "AIConfigSnapshot", racing_snapshot)
+        assert get_ai_service().base_url == "http://ai.test"
+        assert get_ai_service().base_url == "http://other.test"
+
+    def test_switching_back_reuses_previous_instance(self, mock_ai_server, set_ai_config):
+        """Test that returning to a recent config reuses its cached service."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        first = get_ai_service()
+        set_ai_config(BASE_URL="http://other.test")
+        assert get_ai_service() is not first
+        set_ai_config(BASE_URL=first.base_url)
+        assert get_ai_service() is first
+
+    async def test_pool_evicts_and_closes_least_recent(self, mock_ai_server, set_ai_config):
+        """Test that the pool is bounded and closes the client of the evicted service."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        clients = []
+        for i in range(ai_service._AI_SERVICE_POOL_SIZE + 1):
+            set_ai_config(BASE_URL=f"http://ai-{i}.test")
+            clients.append(get_ai_service().client)
+        await asyncio.gather(*ai_service._pending_closes)
+        assert len(ai_service._registry.pool) == ai_service._AI_SERVICE_POOL_SIZE
+        assert clients[0].is_closed
+        assert not clients[-1].is_closed
+
+    def test_client_created_lazily(self, mock_ai_server):
+        """Test that getting the service does not open an HTTP client."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        service = get_ai_service()
+        assert service._client is None
+        assert service.client is service.client
+
+    async def test_reset_closes_clients(self, mock_ai_server):
+        """Test that reset_ai_service closes the HTTP client of pooled services."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        service = get_ai_service()
+        client = service.client
+        ai_service.reset_ai_service()
+        await asyncio.gather(*ai_service._pending_closes)
+        assert client.is_closed
+        assert get_ai_service() is not service
+
+    async def test_request_after_reset_uses_fresh_client(self, mock_ai_server):
+        """Test that a caller still holding a retired service does not start on the client being closed."""
+        mock_ai_server(lambda request: httpx.Response(200, json={"data": [{"id": "m1"}]}))
+        service = get_ai_service()
+        client = service.client
+        ai_service.reset_ai_service()
+        assert await service.get_available_models() == ["m1"]
+        await asyncio.gather(*ai_service._pending_closes)
+        assert client.is_closed
+        assert service._client is None
+
+    async def test_reset_waits_for_in_flight_stream(self, mock_ai_server):
+        """Test that a reset mid-stream leaves the client open until the stream ends."""
+        body = "\n\n".join([
+            sse({"choices": [{"delta": {"content": "a"}}]}),
+            sse({"choices": [{"delta": {"content": "b"}}]}),
+            "data: [DONE]",
+        ])
+        mock_ai_server(lambda request: httpx.Response(200, text=body))
+        service = get_ai_service()
+        stream = service.analyze_stream("log")
+        assert await stream.__anext__() == "a"
+        client = service.client
+        ai_service.reset_ai_service()
+        await asyncio.gather(*ai_service._pending_closes)
+        assert not client.is_closed
+        assert [chunk async for chunk in stream] == ["b"]
+        await asyncio.gather(*ai_service._pending_closes)
+        assert client.is_closed
+
+    def test_pool_keyed_by_content_not_identity(self, mock_ai_server):
+        """Test that equal but distinct snapshots resolve to the same pooled service."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        snapshot = AIConfig.snapshot()
+        copy = AIConfigSnapshot(
+            base_url=snapshot.base_url, api_key=snapshot.api_key, model=snapshot.model,
+            max_tokens=snapshot.max_tokens, temperature=snapshot.temperature,
+            timeout=snapshot.timeout, streaming_enabled=snapshot.streaming_enabled
+        )
+        assert copy is not snapshot and hash(copy) == hash(snapshot)
+        registry = ai_service._registry
+        service = registry._get_pooled(snapshot)
+        assert registry._get_pooled(copy) is service
+        assert service.config is snapshot
+
+    async def test_close_ai_services_closes_pooled_clients(self, mock_ai_server):
+        """Test that close_ai_services closes pooled clients and empties the pool."""
+        mock_ai_server(lambda request: httpx.Response(200))
+        client = get_ai_service().client
+        await ai_service.close_ai_services()
+        assert client.is_closed
+        assert not ai_service._registry.pool
+
+    async def test_warmup_prefetches_models(self, mock_ai_server):
+        """Test that the startup warmup fills the models cache in the background."""
+        requests = mock_ai_server(lambda request: httpx.Response(200, json={"data": [{"id": "m1"}]}))
+        ai_service.start_ai_warmup()
+        await ai_service._warmup_task
+        assert [r.url.path for r in requests] == ["/v1/models"]
+        assert await get_ai_service().get_available_models() == ["m1"]
+        assert len(requests) == 1
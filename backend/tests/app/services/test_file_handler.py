@@ -0,0 +1,439 @@
+"""Tests for file_handler.py (regular files and folders)"""
+
+import os
+import asyncio
+import threading
+import pytest
+import tempfile
+import shutil
+import zipfile
+from pathlib import Path
+
+from app.services import file_handler
+from app.services.file_handler import (
+    list_files_in_folder,
+    list_folder_files,
+    is_logcat_file,
+    classify_logcat_files,
+    validate_file_path,
+    read_file,
+    read_file_lines,
+    read_file_text_chunks,
+    aread_file_chunks,
+    aread_file_text_chunks,
+    CancelledError,
+)
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for test files."""
+    temp_path = tempfile.mkdtemp()
+    yield temp_path
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+
+@pytest.fixture
+def file_tree(temp_dir):
+    """Create a small nested folder tree."""
+    root = Path(temp_dir)
+    (root / "sub" / "deeper").mkdir(parents=True)
+    for rel in ("a.log", "sub/b.log", "sub/deeper/c.txt"):
+        (root / rel).write_text(rel)
+    return root
+
+
+class TestListFilesInFolder:
+    """Tests for list_files_in_folder()."""
+
+    async def test_recursive_lists_nested_files_sorted(self, file_tree):
+        """Test that nested files are listed, sorted, without directories."""
+        files = await list_files_in_folder(str(file_tree), recursive=True)
+        assert files == sorted(str(file_tree / rel) for rel in ("a.log", "sub/b.log", "sub/deeper/c.txt"))
+
+    async def test_recursive_across_many_subtrees(self, temp_dir):
+        """Test that subtrees walked in parallel are all listed."""
+        root = Path(temp_dir)
+        expected = []
+        for i in range(12):
+            nested = root / f"dir{i}" / "nested"
+            nested.mkdir(parents=True)
+            (nested / "x.log").write_text("x")
+            expected.append(str(nested / "x.log"))
+        (root / "top.log").write_text("top")
+        expected.append(str(root / "top.log"))
+        assert await list_files_in_folder(temp_dir, recursive=True) == sorted(expected)
+
+    async def test_unsorted(self, file_tree):
+        """Test that sort=False returns the same files in walk order."""
+        files = await list_files_in_folder(str(file_tree), recursive=True, sort=False)
+        assert sorted(files) == await list_files_in_folder(str(file_tree), recursive=True)
+
+    async def test_non_recursive_lists_top_level_only(self, file_tree):
+        """Test that only top-level files are listed when not recursive."""
+        files = await list_files_in_folder(str(file_tree), recursive=False)
+        assert files == [str(file_tree / "a.log")]
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    async def test_symlinked_directories_not_followed(self, file_tree):
+        """Test that symlinked directories are not descended into (matches rglob)."""
+        os.symlink(file_tree / "sub", file_tree / "link")
+        files = await list_files_in_folder(str(file_tree), recursive=True)
+        assert not any("link" in f for f in files)
+
+    async def test_nothing_pruned_by_default(self, file_tree):
+        """Test that hidden and vendored entries are listed unless pruning is asked for."""
+        for rel in (".logs/app.log", "node_modules/x.log", ".DS_Store"):
+            (file_tree / rel).parent.mkdir(exist_ok=True)
+            (file_tree / rel).write_text(rel)
+        files = await list_files_in_folder(str(file_tree), recursive=True)
+        for rel in (".logs/app.log", "node_modules/x.log", ".DS_Store"):
+            assert str(file_tree / rel) in files
+
+    async def test_hidden_and_skipped_directories_pruned(self, file_tree):
+        """Test that hidden and skip-listed directories are not descended into when pruning."""
+        for rel in (".git/objects/x", "node_modules/pkg/y.log", "sub/.cache/z.log"):
+            (file_tree / rel).parent.mkdir(parents=True, exist_ok=True)
+            (file_tree / rel).write_text(rel)
+        (file_tree / ".hidden.log").write_text("top-level hidden files are kept")
+        files = await list_files_in_folder(str(file_tree), recursive=True, prune=True)
+        assert files == sorted(str(file_tree / rel) for rel in (".hidden.log", "a.log", "sub/b.log", "sub/deeper/c.txt"))
+
+    async def test_os_metadata_skipped(self, file_tree):
+        """Test that __MACOSX folders and .DS_Store files are not listed when pruning."""
+        (file_tree / "__MACOSX").mkdir()
+        (file_tree / "__MACOSX" / "._a.log").write_text("resource fork")
+        (file_tree / ".DS_Store").write_text("finder")
+        (file_tree / "sub" / ".DS_Store").write_text("finder")
+        files = await list_files_in_folder(str(file_tree), recursive=True, prune=True)
+        assert files == sorted(str(file_tree / rel) for rel in ("a.log", "sub/b.log", "sub/deeper/c.txt"))
+
+    async def test_custom_skip_dirs(self, file_tree):
+        """Test that skip_dirs replaces the default skip list."""
+        files = await list_files_in_folder(str(file_tree), recursive=True, prune=True, skip_dirs={"deeper"})
+        assert files == sorted(str(file_tree / rel) for rel in ("a.log", "sub/b.log"))
+
+    async def test_not_a_directory(self, file_tree):
+        """Test that a file path is rejected."""
+        with pytest.raises(NotADirectoryError):
+            await list_files_in_folder(str(file_tree / "a.log"))
+
+
+class TestListFolderFiles:
+    """Tests for list_folder_files()."""
+
+    def test_relative_folder_gives_absolute_sorted_paths(self, file_tree, monkeypatch):
+        """Test that a relative folder path is resolved and results are sorted."""
+        monkeypatch.chdir(file_tree)
+        files = list_folder_files("sub")
+        root = os.path.realpath(file_tree)
+        assert files == [os.path.join(root, "sub", "b.log"), os.path.join(root, "sub", "deeper", "c.txt")]
+
+    def test_non_recursive(self, file_tree):
+        """Test that only top-level files are listed when not recursive."""
+        assert list_folder_files(str(file_tree), recursive=False) == [os.path.join(os.path.realpath(file_tree), "a.log")]
+
+    def test_hidden_and_vendored_entries_kept_unless_pruning(self, file_tree):
+        """Test that nothing is pruned by default, and prune=True skips what list_files_in_folder skips."""
+        for rel in (".logs/app.log", "node_modules/x.log", "other/y.log", ".DS_Store"):
+            (file_tree / rel).parent.mkdir(exist_ok=True)
+            (file_tree / rel).write_text(rel)
+        root = os.path.realpath(file_tree)
+        files = list_folder_files(str(file_tree))
+        for rel in (".logs/app.log", "node_modules/x.log", ".DS_Store"):
+            assert os.path.join(root, rel) in files
+        pruned = list_folder_files(str(file_tree), prune=True)
+        assert pruned == [os.path.join(root, rel) for rel in ("a.log", "other/y.log", "sub/b.log", "sub/deeper/c.txt")]
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    def test_symlinked_files_resolved_to_target(self, file_tree, tmp_path):
+        """Test that symlinked files are listed by their target, as Path.resolve() would."""
+        target = tmp_path / "outside.log"
+        target.write_text("outside\n")
+        os.symlink(target, file_tree / "link1.log")
+        os.symlink(target, file_tree / "sub" / "link2.log")
+        root = os.path.realpath(file_tree)
+        resolved = os.path.realpath(target)
+        for recursive in (True, False):
+            files = list_folder_files(str(file_tree), recursive=recursive)
+            assert os.path.join(root, "link1.log") not in files
+            assert resolved in files
+        files = list_folder_files(str(file_tree))
+        assert files.count(resolved) == 2
+        assert os.path.join(root, "a.log") in files
+
+
+LOGCAT_LINE = "01-01 12:00:00.000  1234  1234 I Tag: message\n"
+
+
+class TestIsLogcatFile:
+    """Tests for is_logcat_file()."""
+
+    def test_detects_logcat(self, temp_dir):
+        """Test that a file with logcat lines is detected."""
+        path = Path(temp_dir) / "logcat.txt"
+        path.write_text("--------- beginning of main\n" + LOGCAT_LINE * 5)
+        assert is_logcat_file(str(path))
+
+    def test_too_few_matching_lines(self, temp_dir):
+        """Test that fewer than 3 logcat lines in the first 10 is not enough."""
+        path = Path(temp_dir) / "mixed.txt"
+        path.write_text("plain\n" * 8 + LOGCAT_LINE * 5)
+        assert not is_logcat_file(str(path))
+
+    def test_non_utf8_bytes_are_tolerated(self, temp_dir):
+        """Test that invalid UTF-8 in the file does not break detection."""
+        path = Path(temp_dir) / "binary.txt"
+        path.write_bytes(b"\xff\xfe garbage\n" + LOGCAT_LINE.encode() * 3)
+        assert is_logcat_file(str(path))
+
+    def test_minimal_logcat_lines(self, temp_dir):
+        """Test that the shortest valid logcat lines pass the pre-filter."""
+        path = Path(temp_dir) / "short.txt"
+        path.write_text("01-01 12:00:00.000 1 1 I\n" * 3)
+        assert is_logcat_file(str(path))
+
+    def test_binary_content_rejected(self, temp_dir):
+        """Test that content with NUL bytes is not logcat even if lines match."""
+        path = Path(temp_dir) / "dump.txt"
+        path.write_bytes(LOGCAT_LINE.encode() * 3 + b"\x00\x01")
+        assert not is_logcat_file(str(path))
+
+    def test_binary_extension_rejected(self, temp_dir):
+        """Test that known binary extensions are skipped without reading."""
+        path = Path(temp_dir) / "logcat.gz"
+        path.write_text(LOGCAT_LINE * 5)
+        assert not is_logcat_file(str(path))
+
+    def test_long_single_line_file(self, temp_dir):
+        """Test that a huge file without newlines is rejected from its head."""
+        path = Path(temp_dir) / "blob.txt"
+        path.write_bytes(b"a" * (4 * 1024 * 1024))
+        assert not is_logcat_file(str(path))
+
+    def test_missing_file(self, temp_dir):
+        """Test that a missing file is not logcat."""
+        assert not is_logcat_file(str(Path(temp_dir) / "missing.txt"))
+
+
+class TestClassifyLogcatFiles:
+    """Tests for classify_logcat_files()."""
+
+    def test_classifies_each_path(self, temp_dir):
+        """Test that every path is mapped to its is_logcat_file result."""
+        paths = []
+        for i in range(6):
+            path = Path(temp_dir) / f"file{i}.txt"
+            path.write_text(LOGCAT_LINE * 3 if i % 2 else "plain\n" * 3)
+            paths.append(str(path))
+        missing = str(Path(temp_dir) / "missing.txt")
+        result = classify_logcat_files(paths + [missing])
+        assert result == {**{p: bool(i % 2) for i, p in enumerate(paths)}, missing: False}
+
+    def test_empty(self):
+        """Test that no paths gives an empty result."""
+        assert classify_logcat_files([]) == {}
+
+
+class TestValidateFilePath:
+    """Tests for validate_file_path() on regular paths."""
+
+    def test_file_and_directory_are_valid(self, file_tree):
+        """Test that existing files and directories are accepted."""
+        assert validate_file_path(str(file_tree / "a.log"))
+        assert validate_file_path(str(file_tree))
+
+    def test_missing_path_is_invalid(self, file_tree):
+        """Test that a nonexistent path is rejected."""
+        assert not validate_file_path(str(file_tree / "missing.log"))
+
+    def test_relative_path_with_dots(self, file_tree, monkeypatch):
+        """Test that relative paths with .. components are resolved by the OS."""
+        monkeypatch.chdir(file_tree / "sub")
+        assert validate_file_path(os.path.join("..", "a.log"))
+
+    def test_null_byte_is_invalid(self):
+        """Test that a path with an embedded null byte is rejected rather than raising."""
+        assert not validate_file_path("bad\0path")
+
+    def test_zip_checked_once_per_archive_state(self, temp_dir, monkeypatch):
+        """Test that zip validity is cached per archive and rechecked once it changes."""
+        zip_path = Path(temp_dir) / "logs.zip"
+        zip_path.write_bytes(b"not a zip")
+        calls = []
+        real_is_zip_file = file_handler.is_zip_file
+        monkeypatch.setattr(file_handler, "is_zip_file", lambda p: calls.append(p) or real_is_zip_file(p))
+
+        assert not validate_file_path(f"{zip_path}::a.log")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("a.log", "a")
+            zf.writestr("b.log", "b")
+        assert validate_file_path(f"{zip_path}::a.log")
+        assert validate_file_path(f"{zip_path}::b.log")
+        assert len(calls) == 2
+
+    def test_access_rechecked_on_every_call(self, file_tree, monkeypatch):
+        """Test that losing read access is seen even though the file's stat is unchanged."""
+        path = str(file_tree / "a.log")
+        assert validate_file_path(path)
+        monkeypatch.setattr(file_handler.os, "access", lambda p, mode: False)
+        assert not validate_file_path(path)
+
+
+class TestReadFile:
+    """Tests for read_file()."""
+
+    async def test_reads_whole_file(self, temp_dir):
+        """Test that the full content is returned, including multi-byte text."""
+        path = Path(temp_dir) / "app.log"
+        content = "로그 line\n" * 50000
+        path.write_text(content, encoding="utf-8")
+        assert await read_file(str(path)) == content
+
+    async def test_reads_large_file(self, temp_dir):
+        """Test that files above the single-read cutoff are read in full."""
+        path = Path(temp_dir) / "big.log"
+        content = "로그 line\n" * 100000
+        path.write_text(content, encoding="utf-8")
+        assert path.stat().st_size >= file_handler.SMALL_FILE_MAX_SIZE
+        assert await read_file(str(path)) == content
+
+    async def test_invalid_utf8_is_dropped(self, temp_dir):
+        """Test that invalid UTF-8 bytes are ignored."""
+        path = Path(temp_dir) / "bad.log"
+        path.write_bytes(b"ok\xff\xfe done\r\n")
+        assert await read_file(str(path)) == "ok done\r\n"
+
+    async def test_empty_file(self, temp_dir):
+        """Test that an empty file reads as an empty string."""
+        path = Path(temp_dir) / "empty.log"
+        path.write_bytes(b"")
+        assert await read_file(str(path)) == ""
+
+    async def test_missing_file(self, temp_dir):
+        """Test that a missing file is rejected."""
+        with pytest.raises(ValueError):
+            await read_file(str(Path(temp_dir) / "missing.log"))
+
+    async def test_runs_on_file_io_pool(self, temp_dir, monkeypatch):
+        """Test that the blocking read runs on the dedicated file I/O threads."""
+        path = Path(temp_dir) / "app.log"
+        path.write_text("x")
+        monkeypatch.setattr(file_handler, "_read_file_sync", lambda p: threading.current_thread().name)
+        assert (await read_file(str(path))).startswith("file-io")
+
+
+class TestReadFileLines:
+    """Tests for read_file_lines() on regular files."""
+
+    def test_text_mode_translates_newlines(self, temp_dir):
+        """Test that text mode decodes lines and normalizes CRLF."""
+        path = Path(temp_dir) / "app.log"
+        path.write_bytes("로그 one\r\ntwo\n".encode("utf-8"))
+        assert list(read_file_lines(str(path))) == ["로그 one\n", "two\n"]
+
+    def test_cancellation_checked_every_1024_lines(self, temp_dir):
+        """Test that a cancellation set mid-read stops at the next 1024-line boundary."""
+        path = Path(temp_dir) / "app.log"
+        path.write_text("line\n" * 5000)
+        event = asyncio.Event()
+        read = 0
+        with pytest.raises(CancelledError):
+            for _ in read_file_lines(str(path), cancellation_event=event):
+                read += 1
+                event.set()
+        assert read == 1024
+
+class TestReadFileChunks:
+    """Tests for read_file_chunks() on regular files."""
+
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+    def test_advises_sequential_access(self, temp_dir, monkeypatch):
+        """Test that the kernel is told the file will be read sequentially."""
+        calls = []
+        monkeypatch.setattr(file_handler.os, "posix_fadvise", lambda *args: calls.append(args))
+        path = Path(temp_dir) / "app.log"
+        path.write_bytes(b"x" * 10)
+        assert list(file_handler.read_file_chunks(str(path), chunk_size=4)) == [b"xxxx", b"xxxx", b"xx"]
+        assert calls and calls[0][1:] == (0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+    def test_cancellation_checked_once_per_interval(self, temp_dir, monkeypatch):
+        """Test that cancellation is checked every CANCELLATION_CHECK_BYTES, not every chunk."""
+        monkeypatch.setattr(file_handler, "CANCELLATION_CHECK_BYTES", 8)
+        path = Path(temp_dir) / "app.log"
+        path.write_bytes(b"x" * 40)
+        event = asyncio.Event()
+        chunks = file_handler.read_file_chunks(str(path), chunk_size=4, cancellation_event=event)
+        assert next(chunks) == b"xxxx"
+        event.set()
+        assert next(chunks) == b"xxxx"
+        with pytest.raises(CancelledError):
+            next(chunks)
+
+class TestReadFileTextChunks:
+    """Tests for read_file_text_chunks()."""
+
+    def test_multibyte_split_across_chunks(self, temp_dir):
+        """Test that a character split by a chunk boundary is decoded intact."""
+        path = Path(temp_dir) / "app.log"
+        content = "a" + "로그" * 100
+        path.write_text(content, encoding="utf-8")
+        chunks = list(read_file_text_chunks(str(path), chunk_size=2))
+        assert "".join(chunks) == content
+
+    def test_invalid_utf8_is_dropped(self, temp_dir):
+        """Test that invalid and truncated UTF-8 bytes are ignored."""
+        path = Path(temp_dir) / "bad.log"
+        path.write_bytes(b"ok\xff done\xe1\x84")
+        assert "".join(read_file_text_chunks(str(path), chunk_size=3)) == "ok done"
+
+
+class TestAreadFileChunks:
+    """Tests for aread_file_chunks()."""
+
+    async def test_yields_all_chunks(self, temp_dir):
+        """Test that chunks reassemble to the file content."""
+        path = Path(temp_dir) / "app.log"
+        path.write_text("x" * 2500)
+        chunks = [chunk async for chunk in aread_file_chunks(str(path), chunk_size=1000)]
+        assert [len(c) for c in chunks] == [1000, 1000, 500]
+
+    async def test_cancellation(self, temp_dir):
+        """Test that a set cancellation event stops reading."""
+        path = Path(temp_dir) / "app.log"
+        path.write_text("x" * 2500)
+        event = asyncio.Event()
+        event.set()
+        with pytest.raises(CancelledError):
+            async for _ in aread_file_chunks(str(path), chunk_size=1000, cancellation_event=event):
+                pass
+
+    async def test_task_cancel_stops_iteration(self, temp_dir):
+        """Test that cancelling the consuming task interrupts reading."""
+        path = Path(temp_dir) / "app.log"
+        path.write_text("x" * 10000)
+        seen = []
+
+        async def consume():
+            async for chunk in aread_file_chunks(str(path), chunk_size=100):
+                seen.append(chunk)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.03)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert 0 < len(seen) < 100
+
+
+class TestAreadFileTextChunks:
+    """Tests for aread_file_text_chunks()."""
+
+    async def test_decodes_split_multibyte_character(self, temp_dir):
+        """Test that a character split across chunks is decoded intact."""
+        path = Path(temp_dir) / "app.log"
+        path.write_bytes("a\u00e9b".encode("utf-8"))
+        chunks = [chunk async for chunk in aread_file_text_chunks(str(path), chunk_size=2)]
+        assert "".join(chunks) == "a\u00e9b"
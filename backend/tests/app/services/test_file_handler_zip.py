@@ -4,9 +4,11 @@ import pytest
 import tempfile
 import zipfile
 import shutil
+import time
 from pathlib import Path
 import asyncio
 
+from app.services import file_handler
 from app.services.file_handler import (
     is_zip_file,
     parse_zip_path,
@@ -17,6 +19,7 @@ from app.services.file_handler import (
     extract_file_from_zip,
     read_file_lines,
     read_file_chunks,
+    read_file_text_chunks,
     validate_file_path,
     list_files_in_folder,
     ZIP_VIRTUAL_PATH_SEPARATOR,
@@ -68,6 +71,31 @@ class TestIsZipFile:
         file_path = Path(temp_dir) / "fake.zip"
         file_path.write_text("not a real zip file")
         assert is_zip_file(str(file_path)) is False
+    
+    def test_is_zip_file_empty_zip(self, temp_dir, test_zip_file):
+        """Test that an archive with no entries is a zip."""
+        zip_path = test_zip_file("empty.zip", {})
+        assert is_zip_file(zip_path) is True
+    
+    def test_is_zip_file_truncated_zip(self, temp_dir, test_zip_file):
+        """Test that a zip missing its end-of-central-directory record is rejected."""
+        zip_path = Path(test_zip_file("test.zip", {"file.txt": "content" * 100}))
+        zip_path.write_bytes(zip_path.read_bytes()[:-30])
+        assert is_zip_file(str(zip_path)) is False
+    
+    def test_is_zip_file_does_not_decompress(self, temp_dir, test_zip_file, monkeypatch):
+        """Test that detection does not read entry data."""
+        zip_path = test_zip_file("test.zip", {"file.txt": "content"})
+        monkeypatch.setattr(zipfile.ZipFile, "testzip", lambda self: pytest.fail("entries were read"))
+        assert is_zip_file(zip_path) is True
+    
+    def test_is_zip_file_with_prefix(self, temp_dir, test_zip_file):
+        """Test that an archive with data prepended (e.g. a self-extracting stub) is detected."""
+        zip_path = test_zip_file("plain.zip", {"file.txt": "content"})
+        prefixed = Path(temp_dir) / "sfx.zip"
+        prefixed.write_bytes(b"#!/bin/sh\necho stub\n" + Path(zip_path).read_bytes())
+        assert is_zip_file(str(prefixed)) is True
+        assert list(read_file_from_zip(str(prefixed), "file.txt")) == ["content"]
 
 
 class TestParseZipPath:
@@ -111,6 +139,11 @@ class TestSanitizeZipPath:
         """Test removing leading slashes."""
         assert sanitize_zip_path("/path/to/file.txt") == "path/to/file.txt"
         assert sanitize_zip_path("\\path\\to\\file.txt") == "path/to/file.txt"
+        assert sanitize_zip_path("\\/path/to/file.txt") == "path/to/file.txt"
+    
+    def test_sanitize_zip_path_dotted_names_kept(self):
+        """Test that names merely containing dots are not treated as traversal."""
+        assert sanitize_zip_path("a..b/.hidden/file.txt") == "a..b/.hidden/file.txt"
     
     def test_sanitize_zip_path_traversal(self):
         """Test removing path traversal sequences."""
@@ -292,6 +325,24 @@ class TestReadFileFromZip:
         lines = list(read_file_from_zip(zip_path, "subdir/file.txt"))
         assert len(lines) == 1
         assert lines[0] == "content"
+    
+    def test_read_file_from_zip_case_insensitive(self, temp_dir, test_zip_file):
+        """Test that a member is found when only the case differs."""
+        zip_path = test_zip_file("test.zip", {
+            "Logs/Main.TXT": "main",
+            "logs/other.txt": "other"
+        })
+        assert list(read_file_from_zip(zip_path, "logs/main.txt")) == ["main"]
+        assert list(read_file_from_zip(zip_path, "LOGS/OTHER.TXT")) == ["other"]
+    
+    def test_read_file_from_zip_case_insensitive_after_rewrite(self, temp_dir, test_zip_file):
+        """Test that the case-insensitive index follows a rewritten archive."""
+        zip_path = test_zip_file("test.zip", {"Old.txt": "old"})
+        assert list(read_file_from_zip(zip_path, "old.txt")) == ["old"]
+        test_zip_file("test.zip", {"New.txt": "new data"})
+        assert list(read_file_from_zip(zip_path, "new.txt")) == ["new data"]
+        with pytest.raises(FileNotFoundError):
+            list(read_file_from_zip(zip_path, "old.txt"))
 
 
 class TestExtractFileFromZip:
@@ -326,6 +377,26 @@ class TestExtractFileFromZip:
         assert extracted_path.exists()
         assert extracted_path.read_text() == large_content
     
+    def test_extract_file_from_zip_filename(self, temp_dir, test_zip_file):
+        """Test that the extracted name keeps the member's stem and last suffix."""
+        zip_path = test_zip_file("test.zip", {"logs/app.tar.gz": "a", "logs/.hidden": "b"})
+        extract_to = Path(temp_dir) / "extract"
+        
+        archive = extract_file_from_zip(zip_path, "logs/app.tar.gz", extract_to)
+        hidden = extract_file_from_zip(zip_path, "logs/.hidden", extract_to)
+        assert archive.name.startswith("app.tar_") and archive.suffix == ".gz"
+        assert hidden.name.startswith(".hidden_") and hidden.suffix == ""
+    
+    def test_extract_file_from_zip_empty_file(self, temp_dir, test_zip_file):
+        """Test extracting an empty member creates an empty file."""
+        zip_path = test_zip_file("test.zip", {"empty.txt": ""})
+        extract_to = Path(temp_dir) / "extract"
+        extract_to.mkdir()
+        
+        extracted_path = extract_file_from_zip(zip_path, "empty.txt", extract_to)
+        assert extracted_path is not None
+        assert extracted_path.read_bytes() == b""
+    
     def test_extract_file_from_zip_nonexistent(self, temp_dir, test_zip_file):
         """Test extracting a nonexistent file."""
         zip_path = test_zip_file("test.zip", {"file.txt": "content"})
@@ -396,6 +467,14 @@ class TestReadFileChunksZip:
         virtual_path = f"{zip_path}{ZIP_VIRTUAL_PATH_SEPARATOR}file.txt"
         chunks = list(read_file_chunks(virtual_path, chunk_size=1000))
         assert len(chunks) > 0
+        assert b"".join(chunks) == content.encode()
+    
+    def test_read_file_text_chunks_virtual_path_multibyte(self, temp_dir, test_zip_file):
+        """Test that multi-byte characters split across zip chunks are decoded intact."""
+        content = "로그 " * 1000
+        zip_path = test_zip_file("test.zip", {"file.txt": content})
+        virtual_path = f"{zip_path}{ZIP_VIRTUAL_PATH_SEPARATOR}file.txt"
+        chunks = list(read_file_text_chunks(virtual_path, chunk_size=1000))
         assert "".join(chunks) == content
     
     def test_read_file_chunks_virtual_path_cancellation(self, temp_dir, test_zip_file):
@@ -467,3 +546,141 @@ class TestListFilesInFolderZip:
         assert len(files) == 1
         assert ZIP_VIRTUAL_PATH_SEPARATOR in files[0]
         assert "file.txt" in files[0]
+    
+    @pytest.mark.asyncio
+    async def test_list_files_in_folder_many_zips(self, temp_dir, test_zip_file):
+        """Test that every zip's contents are listed when several zips are expanded together."""
+        for i in range(5):
+            test_zip_file(f"test{i}.zip", {f"file{i}.txt": "content"})
+        (Path(temp_dir) / "broken.zip").write_text("not a zip")
+        files = await list_files_in_folder(temp_dir, recursive=True)
+        expected = [f"{Path(temp_dir) / f'test{i}.zip'}{ZIP_VIRTUAL_PATH_SEPARATOR}file{i}.txt" for i in range(5)]
+        assert files == sorted(expected + [str(Path(temp_dir) / "broken.zip")])
+
+
+class TestOpenZipCache:
+    """Tests for reuse of open archives across member reads."""
+    
+    @pytest.fixture(autouse=True)
+    def _empty_cache(self):
+        file_handler.close_open_zips()
+        yield
+        file_handler.close_open_zips()
+    
+    @pytest.fixture
+    def opened(self, monkeypatch):
+        """Record the paths ZipFile opens for reading."""
+        paths = []
+        real_zipfile = zipfile.ZipFile
+        
+        def _record(file, mode="r", *args, **kwargs):
+            if mode == "r":
+                paths.append(file)
+            return real_zipfile(file, mode, *args, **kwargs)
+        
+        monkeypatch.setattr(file_handler.zipfile, "ZipFile", _record)
+        return paths
+    
+    def test_archive_opened_once_for_many_members(self, temp_dir, test_zip_file, opened):
+        """Test that reading several members parses the archive once."""
+        zip_path = test_zip_file("test.zip", {f"file{i}.txt": f"content{i}" for i in range(5)})
+        for i in range(5):
+            assert list(read_file_from_zip(zip_path, f"file{i}.txt")) == [f"content{i}"]
+        assert opened == [zip_path]
+    
+    def test_busy_archive_not_shared(self, temp_dir, test_zip_file, opened):
+        """Test that a second reader of a busy archive gets its own ZipFile, closed afterwards."""
+        zip_path = test_zip_file("test.zip", {"file.txt": "line1\nline2\n", "other.txt": "other"})
+        with file_handler._open_zip(zip_path) as first:
+            with file_handler._open_zip(zip_path) as second:
+                assert second is not first
+                assert second.read("other.txt") == b"other"
+            assert second.fp is None
+            assert first.read("file.txt") == b"line1\nline2\n"
+        assert first.fp is not None
+        assert len(opened) == 2
+    
+    def test_idle_archive_closed(self, temp_dir, test_zip_file, monkeypatch):
+        """Test that an archive left unused is closed by the idle timer."""
+        monkeypatch.setattr(file_handler, "_OPEN_ZIP_IDLE_SECONDS", 0.01)
+        zip_path = test_zip_file("test.zip", {"file.txt": "content"})
+        with file_handler._open_zip(zip_path) as zip_ref:
+            pass
+        for _ in range(100):
+            if zip_ref.fp is None:
+                break
+            time.sleep(0.01)
+        assert zip_ref.fp is None
+        assert zip_path not in file_handler._open_zips
+    
+    def test_evicted_archive_usable_until_reader_finishes(self, temp_dir, test_zip_file, monkeypatch):
+        """Test that an archive evicted mid-read stays open for that reader."""
+        monkeypatch.setattr(file_handler, "_OPEN_ZIP_CACHE_SIZE", 1)
+        first = test_zip_file("first.zip", {"file.txt": "line1\nline2\n"})
+        second = test_zip_file("second.zip", {"file.txt": "other"})
+        
+        lines = read_file_from_zip(first, "file.txt")
+        assert next(lines) == "line1\n"
+        assert list(read_file_from_zip(second, "file.txt")) == ["other"]
+        assert list(lines) == ["line2\n"]
+    
+    def test_rewritten_archive_is_reopened(self, temp_dir, test_zip_file):
+        """Test that a rewritten archive is not served from a stale member list."""
+        zip_path = test_zip_file("test.zip", {"file.txt": "old"})
+        assert list(read_file_from_zip(zip_path, "file.txt")) == ["old"]
+        test_zip_file("test.zip", {"file.txt": "new content", "other.txt": "x"})
+        assert list(read_file_from_zip(zip_path, "file.txt")) == ["new content"]
+        assert list(read_file_from_zip(zip_path, "other.txt")) == ["x"]
+    
+    def test_close_open_zips(self, temp_dir, test_zip_file):
+        """Test that closing the cache closes idle archives and leaves later reads working."""
+        zip_path = test_zip_file("test.zip", {"file.txt": "content"})
+        with file_handler._open_zip(zip_path) as zip_ref:
+            pass
+        file_handler.close_open_zips()
+        assert zip_ref.fp is None
+        assert list(read_file_from_zip(zip_path, "file.txt")) == ["content"]
+
+
+class TestMmapStoredEntry:
+    """Tests for reading large uncompressed members through mmap."""
+    
+    @pytest.fixture
+    def stored_zip(self, temp_dir, monkeypatch):
+        """Create a zip with one stored and one deflated member, mmap threshold lowered."""
+        monkeypatch.setattr(file_handler, "MMAP_STORED_MIN_SIZE", 1)
+        content = "".join(f"line {i}\n" for i in range(5000))
+        zip_path = str(Path(temp_dir) / "stored.zip")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("pad.txt", "x" * 70000, compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr("stored.log", content, compress_type=zipfile.ZIP_STORED)
+            zf.writestr("deflated.log", content, compress_type=zipfile.ZIP_DEFLATED)
+        return zip_path, content
+    
+    def test_chunks_match_zipfile(self, stored_zip, monkeypatch):
+        """Test that stored members read via mmap match the zipfile contents."""
+        zip_path, content = stored_zip
+        mapped = []
+        real_mmap = file_handler._mmap_stored_entry
+        monkeypatch.setattr(file_handler, "_mmap_stored_entry", lambda *args: mapped.append(args[1].filename) or real_mmap(*args))
+        
+        for name in ("stored.log", "deflated.log"):
+            path = f"{zip_path}{ZIP_VIRTUAL_PATH_SEPARATOR}{name}"
+            assert b"".join(read_file_chunks(path, chunk_size=1000)) == content.encode()
+        assert mapped == ["stored.log"]
+    
+    def test_lines_match_zipfile(self, stored_zip):
+        """Test that line reads of a stored member stop at the member's end."""
+        zip_path, content = stored_zip
+        assert list(read_file_from_zip(zip_path, "stored.log")) == content.splitlines(keepends=True)
+    
+    def test_encrypted_member_not_mapped(self, stored_zip):
+        """Test that encrypted or compressed members keep the ZipExtFile path."""
+        info = zipfile.ZipInfo("a.log")
+        info.file_size = 100
+        info.flag_bits = 0x1
+        assert not file_handler._use_mmap_for(info)
+        info.flag_bits = 0
+        assert file_handler._use_mmap_for(info)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        assert not file_handler._use_mmap_for(info)